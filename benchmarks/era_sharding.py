@@ -0,0 +1,115 @@
+"""
+시대별 샤딩 검색 vs 전체(flat) 검색 비교.
+
+data/*.txt 를 시대 태그와 함께 임베딩하고, 쿼리마다 다음 세 가지를 비교한다.
+  flat        : 전체 컬렉션 검색
+  where       : 같은 컬렉션에 era 메타데이터 where 필터 (앱에서 쓰는 방식)
+  collections : 시대별로 나눈 별도 컬렉션을 검색해 결과를 합침
+정답은 전체 문서 전수 검색 상위 k 개이며, recall@k 와 지연(라우팅 시간 포함), 전체 검색으로 돌아간 비율을 출력한다.
+
+    python -m benchmarks.era_sharding --k 5 --space l2
+"""
+import argparse
+import glob
+import time
+import uuid
+from collections import Counter
+from typing import List
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from benchmarks.hnsw_sweep import exact_top_k
+from benchmarks.stats import percentile
+from services.chroma_utils import DATA_GLOB, embed_documents, embed_model, hnsw_metadata
+from services.chunking import load_chunks
+from services.era_router import EraRouter, era_filter
+
+
+def _add(collection, client, ids: List[str], embs: np.ndarray, eras: List[str]):
+    batch = client.get_max_batch_size()
+    for i in range(0, len(ids), batch):
+        collection.add(ids=ids[i:i + batch], embeddings=embs[i:i + batch].tolist(),
+                       metadatas=[{"era": e} for e in eras[i:i + batch]])
+
+
+def main(args):
+    docs, metadatas = load_chunks(glob.glob(DATA_GLOB), "line")
+    doc_eras = [m["era"] for m in metadatas]
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+    print(f"문서 {len(docs)}개 {dict(Counter(doc_eras))}, 쿼리 {len(queries)}개")
+
+    doc_embs = np.array(embed_documents(docs, workers=args.workers), dtype=np.float32)
+    query_embs = np.asarray(embed_model.encode(queries), dtype=np.float32)
+    truth = exact_top_k(doc_embs, query_embs, args.k, args.space)
+    router = EraRouter.from_embeddings(doc_embs, doc_eras)
+
+    if args.host:
+        client = chromadb.HttpClient(host=args.host, port=args.port, settings=Settings(anonymized_telemetry=False))
+    else:
+        client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+
+    ids = [str(i) for i in range(len(docs))]
+    prefix = f"era-bench-{uuid.uuid4().hex[:8]}"
+    flat = client.create_collection(name=f"{prefix}-flat", metadata=hnsw_metadata(args.space))
+    _add(flat, client, ids, doc_embs, doc_eras)
+    shards = {}
+    for era in router.eras:
+        idx = [i for i, e in enumerate(doc_eras) if e == era]
+        shards[era] = client.create_collection(name=f"{prefix}-{len(shards)}", metadata=hnsw_metadata(args.space))
+        _add(shards[era], client, [ids[i] for i in idx], doc_embs[idx], [era] * len(idx))
+
+    latencies = {"flat": [], "where": [], "collections": []}
+    recalls = {"flat": [], "where": [], "collections": []}
+    routed = Counter()
+    try:
+        for q_emb, expected in zip(query_embs, truth):
+            q = q_emb.tolist()
+
+            t = time.perf_counter()
+            found = flat.query(query_embeddings=[q], n_results=args.k, include=[])["ids"][0]
+            latencies["flat"].append(time.perf_counter() - t)
+            recalls["flat"].append(len(set(found) & set(expected)) / args.k)
+
+            t = time.perf_counter()
+            eras = router.route(q_emb)
+            found = flat.query(query_embeddings=[q], n_results=args.k, where=era_filter(eras), include=[])["ids"][0]
+            latencies["where"].append(time.perf_counter() - t)
+            recalls["where"].append(len(set(found) & set(expected)) / args.k)
+            routed.update(eras or ["(전체)"])
+
+            t = time.perf_counter()
+            eras = router.route(q_emb)
+            if eras:
+                hits = []
+                for era in eras:
+                    res = shards[era].query(query_embeddings=[q], n_results=args.k, include=["distances"])
+                    hits.extend(zip(res["distances"][0], res["ids"][0]))
+                found = [doc_id for _, doc_id in sorted(hits)[:args.k]]
+            else:
+                found = flat.query(query_embeddings=[q], n_results=args.k, include=[])["ids"][0]
+            latencies["collections"].append(time.perf_counter() - t)
+            recalls["collections"].append(len(set(found) & set(expected)) / args.k)
+    finally:
+        client.delete_collection(name=flat.name)
+        for shard in shards.values():
+            client.delete_collection(name=shard.name)
+
+    print(f"\n라우팅 결과: {dict(routed)}")
+    print(f"{'방식':<12}{'recall@' + str(args.k):>10}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for mode in ("flat", "where", "collections"):
+        print(f"{mode:<12}{sum(recalls[mode]) / len(recalls[mode]):>10.3f}"
+              f"{percentile(latencies[mode], 50) * 1000:>10.2f}{percentile(latencies[mode], 95) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="시대별 샤딩 검색 벤치마크")
+    parser.add_argument("--queries", default="benchmarks/queries.txt", help="한 줄에 쿼리 하나")
+    parser.add_argument("--space", default="l2", choices=["l2", "cosine", "ip"])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4, help="임베딩 워커 수")
+    parser.add_argument("--host", default=None, help="Chroma 서버 주소 (없으면 프로세스 내 Chroma)")
+    parser.add_argument("--port", type=int, default=8000)
+    main(parser.parse_args())
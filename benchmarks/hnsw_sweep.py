@@ -0,0 +1,119 @@
+"""
+HNSW 설정별 검색 recall / 지연 시간 비교.
+
+data/*.txt 를 한 번 임베딩한 뒤, 설정 조합마다 컬렉션을 만들어 쿼리 셋을 검색한다.
+정답은 같은 거리 함수로 계산한 전수(brute-force) 검색 상위 k 개이며, recall@k 와 쿼리 지연을 출력한다.
+recall 이 --min-recall 이상인 설정 중 p50 지연이 가장 짧은 것을 추천한다.
+
+기본은 프로세스 안의 Chroma(EphemeralClient)를 쓰고, --host 를 주면 해당 Chroma 서버를 쓴다.
+    python -m benchmarks.hnsw_sweep --spaces l2,cosine --m 8,16,32 --ef-construction 64,100,200 \\
+        --ef-search 10,32,64,128 --k 5 --min-recall 0.95
+"""
+import argparse
+import glob
+import itertools
+import time
+import uuid
+from typing import List
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+
+from benchmarks.stats import percentile
+from services.chroma_utils import DATA_GLOB, embed_documents, embed_model, hnsw_metadata
+from services.chunking import load_chunks
+
+
+def exact_top_k(doc_embs: np.ndarray, query_embs: np.ndarray, k: int, space: str) -> List[List[str]]:
+    """Chroma 와 같은 거리 정의로 전수 검색"""
+    if space == "l2":
+        dists = (query_embs ** 2).sum(1)[:, None] - 2 * query_embs @ doc_embs.T + (doc_embs ** 2).sum(1)[None, :]
+    elif space == "cosine":
+        d = doc_embs / np.linalg.norm(doc_embs, axis=1, keepdims=True)
+        q = query_embs / np.linalg.norm(query_embs, axis=1, keepdims=True)
+        dists = 1 - q @ d.T
+    else:
+        dists = 1 - query_embs @ doc_embs.T
+    top = np.argsort(dists, axis=1)[:, :k]
+    return [[str(i) for i in row] for row in top]
+
+
+def run_setting(client, docs, doc_embs, query_embs, truth, k, space, m, ef_construction, ef_search) -> dict:
+    name = f"hnsw-sweep-{uuid.uuid4().hex[:8]}"
+    start = time.perf_counter()
+    collection = client.create_collection(name=name, metadata=hnsw_metadata(space, m, ef_construction, ef_search))
+    ids = [str(i) for i in range(len(docs))]
+    batch = client.get_max_batch_size()
+    for i in range(0, len(docs), batch):
+        collection.add(ids=ids[i:i + batch], embeddings=doc_embs[i:i + batch].tolist(), documents=docs[i:i + batch])
+    build_time = time.perf_counter() - start
+
+    latencies, recalls = [], []
+    try:
+        for q_emb, expected in zip(query_embs, truth):
+            t = time.perf_counter()
+            found = collection.query(query_embeddings=[q_emb.tolist()], n_results=k, include=[])["ids"][0]
+            latencies.append(time.perf_counter() - t)
+            recalls.append(len(set(found) & set(expected)) / k)
+    finally:
+        client.delete_collection(name=name)
+
+    return {
+        "space": space, "m": m, "ef_construction": ef_construction, "ef_search": ef_search,
+        "build": build_time, "recall": sum(recalls) / len(recalls),
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+    }
+
+
+def main(args):
+    ints = lambda raw: [int(x) for x in raw.split(",")]
+
+    docs, _ = load_chunks(glob.glob(DATA_GLOB), "line")
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+    print(f"문서 {len(docs)}개, 쿼리 {len(queries)}개 임베딩 중…")
+    doc_embs = np.array(embed_documents(docs, workers=args.workers), dtype=np.float32)
+    query_embs = np.asarray(embed_model.encode(queries), dtype=np.float32)
+
+    if args.host:
+        client = chromadb.HttpClient(host=args.host, port=args.port, settings=Settings(anonymized_telemetry=False))
+    else:
+        client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+
+    rows = []
+    for space in args.spaces.split(","):
+        truth = exact_top_k(doc_embs, query_embs, args.k, space)
+        for m, efc, efs in itertools.product(ints(args.m), ints(args.ef_construction), ints(args.ef_search)):
+            row = run_setting(client, docs, doc_embs, query_embs, truth, args.k, space, m, efc, efs)
+            rows.append(row)
+            print(f"  {space:<7} M={m:<3} efC={efc:<4} efS={efs:<4} recall@{args.k}={row['recall']:.3f} "
+                  f"p50={row['p50'] * 1000:.2f}ms")
+
+    print(f"\n{'space':<8}{'M':>4}{'efC':>6}{'efS':>6}{'build(s)':>10}{'recall':>8}{'p50(ms)':>9}{'p95(ms)':>9}")
+    for row in sorted(rows, key=lambda r: r["p50"]):
+        print(f"{row['space']:<8}{row['m']:>4}{row['ef_construction']:>6}{row['ef_search']:>6}{row['build']:>10.2f}"
+              f"{row['recall']:>8.3f}{row['p50'] * 1000:>9.2f}{row['p95'] * 1000:>9.2f}")
+
+    ok = [r for r in rows if r["recall"] >= args.min_recall]
+    if ok:
+        best = min(ok, key=lambda r: r["p50"])
+        print(f"\n추천: HNSW_SPACE={best['space']} HNSW_M={best['m']} "
+              f"HNSW_EF_CONSTRUCTION={best['ef_construction']} HNSW_EF_SEARCH={best['ef_search']}")
+    else:
+        print(f"\nrecall {args.min_recall} 이상인 설정 없음")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HNSW recall / 지연 시간 스윕")
+    parser.add_argument("--queries", default="benchmarks/queries.txt", help="한 줄에 쿼리 하나")
+    parser.add_argument("--spaces", default="l2,cosine")
+    parser.add_argument("--m", default="8,16,32")
+    parser.add_argument("--ef-construction", default="64,100,200")
+    parser.add_argument("--ef-search", default="10,32,64,128")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--workers", type=int, default=4, help="임베딩 워커 수")
+    parser.add_argument("--host", default=None, help="Chroma 서버 주소 (없으면 프로세스 내 Chroma)")
+    parser.add_argument("--port", type=int, default=8000)
+    main(parser.parse_args())
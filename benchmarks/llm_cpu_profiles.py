@@ -0,0 +1,132 @@
+"""
+EXAONE 추론 프로필 벤치마크.
+
+프로필마다 별도 프로세스에서 모델을 로드해 (피크 RSS 와 스레드 설정이 섞이지 않도록)
+tokens/sec, time-to-first-token, 피크 RSS 를 재고, baseline 출력과의 일치도를 비교한다.
+일치도는 greedy 디코딩 결과를 토큰 단위로 비교한 공통 접두사 비율과 완전 일치 비율이다.
+
+    python -m benchmarks.llm_cpu_profiles --profiles baseline,cpu-fp32,cpu-int8,cpu-int8-compile \\
+        --threads 8 --interop-threads 1 --max-new-tokens 64
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import List
+
+PROMPTS = [
+    "이자겸의 난은 조선시대에 발생했어??",
+    "고인돌은 어느 시대의 무덤이야?",
+    "훈민정음은 누가 만들었어?",
+    "임진왜란 때 이순신은 어떤 활약을 했어?",
+    "갑오개혁의 주요 내용은 뭐야?",
+]
+SYSTEM_PROMPT = "너는 한국사를 친절히 설명해주는 친구야. 사용자의 질문에 대해 단계적으로 답변해줘."
+
+
+def run_worker(args):
+    """현재 프로세스에서 LLM_PROFILE 로 모델을 로드하고 결과를 JSON 한 줄로 출력"""
+    from transformers.generation.streamers import BaseStreamer
+    from services import llm_utils
+
+    class FirstTokenTimer(BaseStreamer):
+        # 첫 put 은 프롬프트, 두 번째 put 이 첫 생성 토큰
+        def __init__(self):
+            self.calls = 0
+            self.first_token_at = None
+
+        def put(self, value):
+            self.calls += 1
+            if self.calls == 2 and self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+
+        def end(self):
+            pass
+
+    # 워밍업 (torch.compile 등 첫 호출 비용 제외)
+    warm = llm_utils.build_lg_ai_inputs(SYSTEM_PROMPT, PROMPTS[0])
+    llm_utils.generate_lg_ai(warm, max_new_tokens=4, do_sample=False)
+
+    results = []
+    for prompt in PROMPTS[:args.prompts]:
+        inputs = llm_utils.build_lg_ai_inputs(SYSTEM_PROMPT, prompt)
+        prompt_len = inputs["input_ids"].shape[1]
+        timer = FirstTokenTimer()
+        start = time.perf_counter()
+        output = llm_utils.generate_lg_ai(inputs, args.max_new_tokens, do_sample=False, streamer=timer)
+        elapsed = time.perf_counter() - start
+        new_tokens = output[0][prompt_len:].tolist()
+        results.append({
+            "tokens": new_tokens,
+            "elapsed": elapsed,
+            "ttft": (timer.first_token_at - start) if timer.first_token_at else elapsed,
+        })
+
+    # Linux 에서 ru_maxrss 단위는 KB
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"profile": llm_utils.LLM_PROFILE, "results": results, "peak_rss_mb": peak_rss_mb}))
+
+
+def agreement(base: List[int], other: List[int]) -> float:
+    """공통 접두사 길이 / 더 긴 출력 길이"""
+    longest = max(len(base), len(other))
+    if longest == 0:
+        return 1.0
+    prefix = 0
+    for a, b in zip(base, other):
+        if a != b:
+            break
+        prefix += 1
+    return prefix / longest
+
+
+def run_profile(profile: str, args) -> dict:
+    env = dict(os.environ, LLM_PROFILE=profile,
+               LLM_TORCH_THREADS=str(args.threads), LLM_TORCH_INTEROP_THREADS=str(args.interop_threads))
+    cmd = [sys.executable, "-m", "benchmarks.llm_cpu_profiles", "--worker",
+           "--prompts", str(args.prompts), "--max-new-tokens", str(args.max_new_tokens)]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+    # 모델 로드 로그 등이 섞일 수 있으므로 마지막 줄만 결과로 사용
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    profiles = args.profiles.split(",")
+    if "baseline" not in profiles:
+        profiles.insert(0, "baseline")
+
+    reports = {}
+    for profile in profiles:
+        print(f"▶ {profile} 실행 중…", file=sys.stderr)
+        reports[profile] = run_profile(profile, args)
+
+    base = reports["baseline"]["results"]
+    print(f"\n{'프로필':<18}{'tok/s':>8}{'TTFT p50':>10}{'RSS(MB)':>10}{'일치도':>8}{'완전일치':>10}")
+    for profile, report in reports.items():
+        results = report["results"]
+        total_tokens = sum(len(r["tokens"]) for r in results)
+        total_time = sum(r["elapsed"] for r in results)
+        ttfts = sorted(r["ttft"] for r in results)
+        scores = [agreement(b["tokens"], r["tokens"]) for b, r in zip(base, results)]
+        exact = sum(1 for b, r in zip(base, results) if b["tokens"] == r["tokens"])
+        print(f"{profile:<18}{total_tokens / total_time:>8.2f}{ttfts[len(ttfts) // 2]:>10.3f}"
+              f"{report['peak_rss_mb']:>10.0f}{sum(scores) / len(scores):>8.2f}{exact:>6}/{len(results)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXAONE CPU 추론 프로필 벤치마크")
+    parser.add_argument("--profiles", default="baseline,cpu-fp32,cpu-int8,cpu-int8-compile")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op 스레드 수 (0 이면 torch 기본값)")
+    parser.add_argument("--interop-threads", type=int, default=0, help="inter-op 스레드 수 (0 이면 torch 기본값)")
+    parser.add_argument("--prompts", type=int, default=len(PROMPTS), help="사용할 프롬프트 수")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parsed = parser.parse_args()
+
+    if parsed.worker:
+        run_worker(parsed)
+    else:
+        main(parsed)
@@ -0,0 +1,17 @@
+"""
+벤치마크·부하 테스트가 같이 쓰는 통계 도우미.
+
+스크립트마다 백분위수 계산이 달라 같은 지연 분포의 p95 가 서로 다르게 나오지 않도록 여기 하나만 둔다.
+무거운 의존성(chromadb, 임베딩 모델)을 끌어오지 않으므로 loadtest 에서도 그대로 import 한다.
+"""
+import math
+from typing import List
+
+
+def percentile(values: List[float], p: float) -> float:
+    """nearest-rank 백분위수 (빈 목록이면 0)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
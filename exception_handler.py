@@ -5,3 +5,13 @@ class BadRequestException(Exception):
 class InternalServerException(Exception):
     def __init__(self, message: str):
         self.message = message
+
+class TooManyRequestsException(Exception):
+    def __init__(self, message: str, retry_after: int):
+        self.message = message
+        self.retry_after = retry_after
+
+class ServiceUnavailableException(Exception):
+    def __init__(self, message: str, retry_after: int):
+        self.message = message
+        self.retry_after = retry_after
@@ -0,0 +1,114 @@
+"""
+부하 테스트용 OpenAI 호환 가짜 서버.
+
+/v1/chat/completions 요청에 대해 정해진 지연 후 미리 만들어 둔 수업(JSON) 응답을 돌려준다.
+시스템 프롬프트를 보고 combined / service / summary 중 어떤 형식을 돌려줄지 고른다.
+
+단독 실행:
+    python -m loadtest.fake_openai --port 18080 --latency 1.0 --jitter 0.2
+앱 쪽에서는 OPENAI_BASE_URL=http://127.0.0.1:18080/v1 로 지정한다.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# 응답 지연(초). create_app() 인자로 덮어쓴다.
+DEFAULT_LATENCY = 1.0
+DEFAULT_JITTER = 0.2
+
+SERVICE_ITEMS = [
+    {
+        "index": 0,
+        "summary": "이자겸의 난이 언제 발생했는지 알아보자!",
+        "question": "좋은 질문이야. 먼저, ‘이자겸의 난’이 일어난 시기를 떠올려 볼까?",
+        "hints": ["고려시대", "인종"],
+    },
+    {
+        "index": 1,
+        "summary": "이자겸의 난 발생 배경에 대해 알아보자!",
+        "question": "맞아. 고려 인종 때 발생했어. 그렇다면 이자겸은 어떻게 권력을 잡았을까?",
+        "hints": ["문벌 귀족", "왕실과 혼인"],
+    },
+    {
+        "index": 2,
+        "summary": "이자겸의 난의 결과에 대해 알아보자!",
+        "question": "잘했어. 이자겸은 왕실과의 혼인으로 권력을 키웠어. 그렇다면 이자겸의 난은 어떻게 끝났을까?",
+        "hints": ["실패", "귀족 사회의 동요"],
+    },
+]
+
+SUMMARY = {
+    "questionSummary": "고려 인종 때 일어난 이자겸의 난에 대해 알아봤어!",
+    "responseSummary": "이자겸은 왕실과의 혼인으로 권력을 키웠고, 난은 실패했지만 귀족 사회를 흔들었어.",
+    "thoughtProcess": [
+        "이자겸의 난의 시기를 이해한다.",
+        "이자겸의 권력 기반을 파악한다.",
+        "이자겸의 난의 결과를 생각한다.",
+    ],
+    "keywords": ["고려시대", "인종", "문벌 귀족", "실패"],
+}
+
+
+def canned_content(system_prompt: str) -> str:
+    """시스템 프롬프트 종류에 맞는 미리 정해진 응답 본문"""
+    if '"service"' in system_prompt:
+        return json.dumps({"service": SERVICE_ITEMS, "summary": SUMMARY}, ensure_ascii=False)
+    if "questionSummary" in system_prompt and "index" not in system_prompt:
+        return json.dumps(SUMMARY, ensure_ascii=False)
+    if "index" in system_prompt:
+        return json.dumps(SERVICE_ITEMS, ensure_ascii=False)
+    return "이자겸의 난은 고려 인종 때 일어난 반란이야."
+
+
+def create_app(latency: float = DEFAULT_LATENCY, jitter: float = DEFAULT_JITTER, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "created": 0, "owned_by": "fake"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        if error_rate and random.random() < error_rate:
+            return JSONResponse(status_code=500, content={"error": {"message": "fake upstream error", "type": "server_error"}})
+
+        system_prompt = next((m["content"] for m in body.get("messages", []) if m.get("role") == "system"), "")
+        content = canned_content(system_prompt)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI 호환 가짜 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="응답 지연 평균(초)")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="응답 지연 흔들림(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency, args.jitter, args.error_rate), host=args.host, port=args.port, log_level="warning")
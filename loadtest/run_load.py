@@ -0,0 +1,223 @@
+"""
+/question 다중 턴 흐름 부하 테스트.
+
+가상 사용자 한 명은 다음 세션을 반복한다.
+  1) 첫 질문 (쿠키 발급, 문서 검색 + LLM 호출)
+  2) 힌트 답변 턴 3번 (직전 힌트로 답을 만들어 보냄, 마지막 턴에서 요약을 받음)
+동시성 단계(--levels)를 올려가며 처리량, 턴 종류별 p50/p95/p99, 오류율, 이벤트 루프 지연을 출력한다.
+
+기본 모드는 가짜 OpenAI 서버와 main:app 을 같은 프로세스의 별도 스레드에서 띄운다.
+이때 앱 서버 이벤트 루프의 지연까지 잰다. Chroma 는 로컬 인스턴스를 미리 띄워 둔다:
+    chroma run --path /tmp/chroma-load --port 8000
+    python -m loadtest.run_load --levels 1,5,10,20 --duration 30 --llm-latency 1.0
+
+이미 떠 있는 서버를 대상으로 하려면 --target 을 준다 (이 경우 서버 루프 지연은 잴 수 없다):
+    python -m loadtest.run_load --target http://127.0.0.1:8001
+"""
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from benchmarks.stats import percentile
+
+SESSION_COOKIE_NAME = "session_id"
+
+QUESTIONS = [
+    "이자겸의 난은 조선시대에 발생했어??",
+    "고인돌은 어느 시대의 무덤이야?",
+    "고려의 무신 정변은 왜 일어났어?",
+    "훈민정음은 누가 만들었어?",
+    "삼국 시대에 불교는 어떻게 전래되었어?",
+    "임진왜란 때 이순신은 어떤 활약을 했어?",
+    "갑오개혁의 주요 내용은 뭐야?",
+]
+
+
+class LagMonitor:
+    """asyncio.sleep 이 예정보다 얼마나 늦게 깨어나는지로 이벤트 루프 지연을 잰다"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+
+    def reset(self):
+        self.samples = []
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.sessions = 0
+
+    def record(self, turn: str, elapsed: float, ok: bool):
+        if ok:
+            self.latencies[turn].append(elapsed)
+        else:
+            self.errors[turn] += 1
+
+
+def _answer_from_hints(hints: List[str]) -> str:
+    # is_answer_related_to_hints 를 통과하도록 힌트 키워드로 답을 만든다
+    return " ".join(hints)
+
+
+async def run_session(http: httpx.AsyncClient, stats: Stats):
+    """세션 하나(첫 질문 → 힌트 답변 → 요약)를 끝까지 진행"""
+    headers = {}
+    body = {"question": random.choice(QUESTIONS)}
+    turn = "first"
+
+    for _ in range(5):
+        start = time.perf_counter()
+        try:
+            resp = await http.post("/question", json=body, headers=headers)
+        except httpx.HTTPError:
+            stats.record(turn, time.perf_counter() - start, ok=False)
+            return
+        elapsed = time.perf_counter() - start
+
+        if resp.status_code != 200:
+            stats.record(turn, elapsed, ok=False)
+            return
+
+        payload = resp.json()
+        if payload.get("type") == "summary":
+            stats.record("summary", elapsed, ok=True)
+            stats.sessions += 1
+            return
+        stats.record(turn, elapsed, ok=True)
+
+        # secure 쿠키라 http 에서는 쿠키 저장소가 보내주지 않으므로 직접 실어 보낸다
+        session_id = resp.cookies.get(SESSION_COOKIE_NAME)
+        if session_id:
+            headers = {"Cookie": f"{SESSION_COOKIE_NAME}={session_id}"}
+        body = {"question": _answer_from_hints(payload["text"]["hints"])}
+        turn = "hint"
+
+
+async def virtual_user(http: httpx.AsyncClient, stats: Stats, deadline: float):
+    while time.perf_counter() < deadline:
+        await run_session(http, stats)
+
+
+async def run_level(target: str, concurrency: int, duration: float, client_lag: LagMonitor,
+                    server_lag: Optional[LagMonitor]) -> dict:
+    stats = Stats()
+    client_lag.reset()
+    if server_lag is not None:
+        server_lag.reset()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=120) as http:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(virtual_user(http, stats, deadline) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "wall": wall,
+        "stats": stats,
+        "client_lag": list(client_lag.samples),
+        "server_lag": list(server_lag.samples) if server_lag is not None else None,
+    }
+
+
+def print_report(result: dict):
+    stats: Stats = result["stats"]
+    wall = result["wall"]
+    total_ok = sum(len(v) for v in stats.latencies.values())
+    total_err = sum(stats.errors.values())
+    total = total_ok + total_err
+
+    print(f"\n=== 동시성 {result['concurrency']} ({wall:.1f}s) ===")
+    print(f"  처리량: {total_ok / wall:.2f} req/s, 완료 세션 {stats.sessions}개 ({stats.sessions / wall:.2f} session/s)")
+    print(f"  오류율: {total_err}/{total} ({(total_err / total * 100) if total else 0:.1f}%)")
+    print(f"  {'턴':<8}{'성공':>6}{'오류':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for turn in ("first", "hint", "summary"):
+        values = stats.latencies.get(turn, [])
+        print(f"  {turn:<8}{len(values):>6}{stats.errors.get(turn, 0):>6}"
+              f"{percentile(values, 50):>9.3f}{percentile(values, 95):>9.3f}{percentile(values, 99):>9.3f}")
+
+    for name in ("client_lag", "server_lag"):
+        samples = result[name]
+        if samples is None:
+            continue
+        print(f"  {name}: p50 {percentile(samples, 50) * 1000:.1f}ms, "
+              f"p99 {percentile(samples, 99) * 1000:.1f}ms, max {max(samples, default=0) * 1000:.1f}ms")
+
+
+def _start_server(app, host: str, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def start_in_process(args) -> LagMonitor:
+    """가짜 OpenAI 서버와 main:app 을 각각 별도 스레드에서 띄우고, 앱 루프 지연 모니터를 붙인다"""
+    from loadtest.fake_openai import create_app
+
+    _start_server(create_app(args.llm_latency, args.llm_jitter, args.llm_error_rate), "127.0.0.1", args.fake_port)
+    # client_registry 가 import 시점에 환경 변수를 읽으므로 main 보다 먼저 설정
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.fake_port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    # 캐시가 켜져 있으면 같은 질문은 LLM 을 다시 부르지 않으므로, 기본은 꺼서 LLM 부하까지 잰다
+    os.environ["LLM_CACHE_MODE"] = args.llm_cache
+
+    from main import app
+
+    server_lag = LagMonitor()
+
+    async def start_lag_monitor():
+        app.state.lag_task = asyncio.create_task(server_lag.run())
+
+    app.router.on_startup.append(start_lag_monitor)
+    _start_server(app, "127.0.0.1", args.app_port)
+    return server_lag
+
+
+async def main(args):
+    server_lag = None
+    target = args.target
+    if target is None:
+        server_lag = start_in_process(args)
+        target = f"http://127.0.0.1:{args.app_port}"
+
+    client_lag = LagMonitor()
+    lag_task = asyncio.create_task(client_lag.run())
+    try:
+        for level in [int(x) for x in args.levels.split(",")]:
+            print_report(await run_level(target, level, args.duration, client_lag, server_lag))
+    finally:
+        lag_task.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/question 다중 턴 부하 테스트")
+    parser.add_argument("--target", default=None, help="이미 떠 있는 앱 주소 (없으면 같은 프로세스에서 띄움)")
+    parser.add_argument("--levels", default="1,5,10,20", help="쉼표로 구분한 동시 사용자 수 단계")
+    parser.add_argument("--duration", type=float, default=30, help="단계별 실행 시간(초)")
+    parser.add_argument("--app-port", type=int, default=8001)
+    parser.add_argument("--fake-port", type=int, default=18080)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="가짜 LLM 응답 지연 평균(초)")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="가짜 LLM 응답 지연 흔들림(초)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="가짜 LLM 500 응답 비율")
+    parser.add_argument("--llm-cache", default="off", choices=["off", "on"], help="앱의 LLM 응답 캐시 모드")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,149 @@
+"""
+로깅 설정.
+
+- 요청 스레드에서는 레코드를 큐에 넣기만 하고, 포맷팅과 stderr 출력은 백그라운드 스레드(QueueListener)가 한다.
+- 레코드는 JSON 한 줄로 출력하며, 요청마다 trace_id 가 붙는다 (X-Request-ID 헤더, 없으면 새로 생성).
+- 메시지가 길면 LOG_MAX_MESSAGE_CHARS 에서 자른다.
+- extra={"verbose": True} 로 남긴 레코드(검색 문서 본문 등)는 모듈별 비율로 샘플링한다.
+  샘플링은 trace_id 기준이라, 뽑힌 요청은 해당 로그가 모두 남는다.
+
+환경 변수
+    LOG_LEVEL=INFO
+    LOG_LEVELS=services.chroma_utils=WARNING,routers.main_router=DEBUG
+    LOG_MAX_MESSAGE_CHARS=500
+    LOG_VERBOSE_SAMPLE_RATE=0.1
+    LOG_VERBOSE_SAMPLE_RATES=services.chroma_utils=0.05,services.chroma_service=1.0
+"""
+import os
+import sys
+import json
+import zlib
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_MAX_MESSAGE_CHARS = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "500"))
+LOG_VERBOSE_SAMPLE_RATE = float(os.getenv("LOG_VERBOSE_SAMPLE_RATE", "0.1"))
+
+_trace_id: ContextVar[str] = ContextVar("trace_id", default="-")
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def set_trace_id(trace_id: str):
+    _trace_id.set(trace_id)
+
+
+def get_trace_id() -> str:
+    return _trace_id.get()
+
+
+def _parse_mapping(raw: str) -> Dict[str, str]:
+    """'a=1,b=2' 형태의 환경 변수를 dict 로"""
+    mapping = {}
+    for item in raw.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            mapping[key.strip()] = value.strip()
+    return mapping
+
+
+class TraceIdFilter(logging.Filter):
+    """레코드를 만든 스레드의 trace_id 를 붙인다 (큐에 넣기 전에 실행돼야 함)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = _trace_id.get()
+        return True
+
+
+class VerboseSamplingFilter(logging.Filter):
+    """extra={"verbose": True} 레코드를 모듈별 비율로 샘플링"""
+
+    def __init__(self, default_rate: float, rates: Dict[str, float]):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = rates
+
+    def _rate(self, name: str) -> float:
+        # 가장 긴 접두사가 일치하는 설정을 사용
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return self.default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "verbose", False):
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        bucket = zlib.crc32(getattr(record, "trace_id", "-").encode()) % 10000
+        return bucket < rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, max_chars: int):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}…(+{len(message) - self.max_chars})"
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "trace_id": getattr(record, "trace_id", "-"),
+            "message": message,
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """기본 QueueHandler 는 큐에 넣기 전에 메시지를 포맷하므로, 포맷은 리스너 스레드로 미룬다"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging():
+    """루트 로거를 큐 핸들러 + 백그라운드 JSON 출력으로 구성 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter(LOG_MAX_MESSAGE_CHARS))
+
+    queue_handler = _LazyQueueHandler(log_queue)
+    queue_handler.addFilter(TraceIdFilter())
+    rates = {k: float(v) for k, v in _parse_mapping(os.getenv("LOG_VERBOSE_SAMPLE_RATES", "")).items()}
+    queue_handler.addFilter(VerboseSamplingFilter(LOG_VERBOSE_SAMPLE_RATE, rates))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+    for name, level in _parse_mapping(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -1,7 +1,18 @@
 import logging
 
+from logging_config import setup_logging, set_trace_id, new_trace_id
+
+# ----------------------
+# 1) 로깅 설정
+# ----------------------
+# 포맷팅·출력은 백그라운드 스레드에서, JSON 한 줄 + 요청별 trace_id.
+# 라우터·서비스 모듈이 import 시점에 남기는 로그도 같은 핸들러를 타도록 가장 먼저 설정한다.
+setup_logging()
+logger = logging.getLogger(__name__)
+
 from fastapi.middleware.cors import CORSMiddleware
-from exception_handler import BadRequestException, InternalServerException
+from exception_handler import BadRequestException, InternalServerException, TooManyRequestsException, \
+    ServiceUnavailableException
 from routers.test_router import router as test_router
 from routers.chunking_router import router as chunking_router
 from routers.main_router import router as main_router
@@ -9,23 +20,17 @@ from routers.llm_router import router as llm_router
 from routers.chroma_router import router as query_router
 from routers.rag_router import router as rag_router
 from services.chroma_utils import init_chroma
+from services.client_registry import close_clients, health_check
+from services.single_flight import lesson_flight
+from services.admission import chat_gpt_admission, lg_ai_admission
+from services.llm_cache import llm_cache
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
-# ----------------------
-# 1) 로깅 설정
-# ----------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
-logger = logging.getLogger(__name__)
-
 # ----------------------
 # 2) FastAPI 앱 초기화
 # ----------------------
-app = FastAPI(on_startup=[init_chroma])
+app = FastAPI(on_startup=[init_chroma], on_shutdown=[close_clients])
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +43,15 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 헤더 허용
 )
 
+@app.middleware("http")
+async def trace_id_middleware(request: Request, call_next):
+    # 요청마다 trace_id 를 정해 라우터·서비스 로그에 전파 (스레드풀, 태스크에도 contextvar 로 전달됨)
+    trace_id = request.headers.get("X-Request-ID") or new_trace_id()
+    set_trace_id(trace_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = trace_id
+    return response
+
 @app.exception_handler(BadRequestException)
 async def bad_request_exception_handler(request: Request, exc: BadRequestException):
     return JSONResponse(
@@ -53,6 +67,39 @@ async def internal_server_exception_handler(request: Request, exc: InternalServe
         content={"number": 500, "message": exc.message}
     )
 
+@app.exception_handler(TooManyRequestsException)
+async def too_many_requests_exception_handler(request: Request, exc: TooManyRequestsException):
+    return JSONResponse(
+        status_code=429,
+        content={"number": 429, "message": exc.message},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.exception_handler(ServiceUnavailableException)
+async def service_unavailable_exception_handler(request: Request, exc: ServiceUnavailableException):
+    return JSONResponse(
+        status_code=503,
+        content={"number": 503, "message": exc.message},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.get("/health")
+def health():
+    # Chroma heartbeat·OpenAI 호출이 블로킹이므로 일반 함수로 두어 스레드풀에서 실행
+    # 하나라도 실패하면 503 으로 알려 로드밸런서·오케스트레이터가 트래픽을 빼도록 한다
+    status = health_check()
+    healthy = all(value == "ok" for value in status.values())
+    return JSONResponse(status_code=200 if healthy else 503, content=status)
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "single_flight": {lesson_flight.name: lesson_flight.stats()},
+        "admission": {a.name: a.stats() for a in (chat_gpt_admission, lg_ai_admission)},
+        "llm_cache": llm_cache.stats(),
+    }
+
 # ----------------------
 # 라우터 등록
 # ----------------------
@@ -1,14 +1,23 @@
+import os
 import logging
 import glob
+import secrets
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sentence_transformers import SentenceTransformer
 from chromadb.errors import NotFoundError
 
-from services.chroma_utils import COLLECTION_NAME
+from schemas import ReindexRequest
+from services.chroma_utils import COLLECTION_NAME, with_active_collection, active_collection_name, hnsw_metadata
+from services.dedup import DEDUP_ENABLED, DEDUP_THRESHOLD
+from services.reindex import start_reindex, read_reindex_status, rollback
 
 router = APIRouter()
 
+# 재색인·롤백 같은 관리용 엔드포인트는 X-Admin-Token 헤더가 이 값과 같을 때만 허용 (비워 두면 모두 거절)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # ─── 예시상정: 이미 init_chroma()에서 client와 embed_model이 전역으로 정의되어 있다고 가정 ───
 # from chromadb import HttpClient
 # client = HttpClient(host="localhost", port=8000, settings=Settings(...))
@@ -17,11 +26,15 @@ router = APIRouter()
 # ─────────────────────────────────────────────────────────────────────────────────────────
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리용 엔드포인트가 비활성화되어 있습니다 (ADMIN_TOKEN 미설정).")
+    if x_admin_token is None:
+        raise HTTPException(status_code=401, detail="X-Admin-Token 헤더가 필요합니다.")
+    if not secrets.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
 
 
 @router.get("/chroma/docs")
@@ -29,21 +42,15 @@ async def read_all_chroma_docs():
     """
     ChromaDB에 저장된 모든 문서(=청크) ID와 본문을 반환합니다.
     - 컬렉션이 없으면 404 에러를 내보냅니다.
-    - n_results를 collection.count()에 맞춰서 모든 문서를 가져옵니다.
+    - collection.get()으로 모든 문서를 한 번에 가져옵니다.
     """
     try:
-        from services.chroma_utils import client
-        collection = client.get_collection(name=COLLECTION_NAME)
+        # 실제 저장된 모든 문서를 꺼내기 (캐시된 컬렉션 핸들 재사용)
+        # include 인자를 생략하면, 기본적으로 ids, documents, embeddings, metadatas 전부 가져옵니다.
+        data = with_active_collection(lambda collection: collection.get())
     except NotFoundError:
         raise HTTPException(status_code=404, detail=f"Collection '{COLLECTION_NAME}' not found")
 
-    # 컬렉션 안에 들어 있는 문서 총 개수 파악
-    total_docs = collection.count()
-
-    # 실제 저장된 모든 문서를 꺼내기 위해 n_results=total_docs 설정
-    # include 인자를 생략하면, 기본적으로 ids, documents, embeddings, metadatas 전부 가져옵니다.
-    data = collection.get()
-
     # Chroma에서 반환하는 data 구조 예시:
     # {
     #   "ids":        ["0", "1", "2", ...],
@@ -62,3 +69,39 @@ async def read_all_chroma_docs():
         })
 
     return {"documents": docs}
+
+
+# Chroma 호출(잠금·상태 읽기)이 블로킹이므로 관리용 엔드포인트는 일반 함수로 두어 스레드풀에서 실행
+@router.post("/chroma/reindex", dependencies=[Depends(require_admin_token)])
+def reindex(req: ReindexRequest):
+    """
+    data/*.txt 를 지정한 청킹 전략으로 새 버전 컬렉션에 재색인합니다.
+    - 백그라운드에서 진행되며, 그동안 검색은 기존 컬렉션으로 계속 처리됩니다.
+    - 문서 수 검증 후 읽기 대상을 전환하고, 기존 컬렉션은 롤백용으로 남깁니다.
+    - X-Admin-Token 헤더가 필요하며, 진행 상태·잠금은 별칭 컬렉션에 남아 모든 워커에서 같이 보입니다.
+    - HNSW 설정(space, m, ef_construction, ef_search)도 새 컬렉션에 적용됩니다. 비운 항목은 HNSW_* 기본값을 씁니다.
+    - dedup 이면 코사인 유사도 dedup_threshold 이상인 문서를 하나로 합치고, 줄어든 비율을 상태에 남깁니다.
+      비우면 DEDUP_ENABLED / DEDUP_THRESHOLD 설정을 씁니다.
+    """
+    params = {
+        "sentence_window": {"window": req.window, "stride": req.stride},
+        "token": {"chunk_tokens": req.chunk_tokens, "overlap": req.overlap},
+    }.get(req.strategy, {})
+    logger.info("▶ /chroma/reindex 요청: %s %s", req.strategy, params)
+    hnsw_fields = {"space": req.space, "m": req.m, "ef_construction": req.ef_construction, "ef_search": req.ef_search}
+    hnsw = hnsw_metadata(**{key: value for key, value in hnsw_fields.items() if value is not None})
+    dedup = DEDUP_ENABLED if req.dedup is None else req.dedup
+    dedup_threshold = DEDUP_THRESHOLD if req.dedup_threshold is None else req.dedup_threshold
+    return start_reindex(req.strategy, params, req.batch_size, req.workers, hnsw,
+                         dedup_threshold if dedup else None)
+
+
+@router.get("/chroma/reindex", dependencies=[Depends(require_admin_token)])
+def reindex_status():
+    return {"status": read_reindex_status(), "active": active_collection_name(force=True)}
+
+
+@router.post("/chroma/reindex/rollback", dependencies=[Depends(require_admin_token)])
+def rollback_reindex():
+    logger.info("▶ /chroma/reindex/rollback 요청")
+    return rollback()
@@ -6,9 +6,12 @@ from starlette.responses import JSONResponse
 
 from exception_handler import BadRequestException
 from schemas import QuestionRequest
-from services.chroma_service import find_k_documents, is_answer_related_to_hints
+from services.chroma_service import find_k_documents_with_ids, is_answer_related_to_hints
 from services.main_prompt_service import generate_service_responses, generate_summary_response, \
     generate_combined_response
+from services.single_flight import lesson_flight, lesson_key
+from services.admission import set_llm_priority, PRIORITY_SESSION, chat_gpt_admission
+from services.llm_cache import run_cache_first
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -21,16 +24,22 @@ async def process_question(request: Request, response: Response,) -> JSONRespons
     # 1) 파싱
     qreq = await convert_request(request)
     question = qreq.question
+    # 세션을 시작하는 LLM 호출은 디버그 엔드포인트보다 먼저 처리
+    set_llm_priority(PRIORITY_SESSION)
 
     # 2) 세션 조회, 없다면 신규 세션 생성
     session_id = request.cookies.get(SESSION_COOKIE_NAME)
-    logger.info(f"▶ /question 요청: {question}, 세션 ID: {session_id}")
+    logger.info("▶ /question 요청: %s, 세션 ID: %s", question, session_id)
     new_session = False
 
     if not session_id or session_id not in sessions: # 첫 질문
         # chroma db에서 유사한 질문 검색, 없으면 예외
-        k_docs = find_k_documents(question)
-        combined_response = generate_combined_response(question, k_docs)
+        k_ids, k_docs = find_k_documents_with_ids(question)
+        # 같은 질문·같은 문서로 진행 중인 생성이 있으면 그 결과를 함께 사용
+        combined_response = await lesson_flight.do(
+            lesson_key(question, k_ids),
+            lambda: run_cache_first(chat_gpt_admission, generate_combined_response, question, k_docs),
+        )
 
         if not combined_response:
             logger.info("✖ 관련된 답변을 찾을 수 없음")
@@ -38,11 +47,11 @@ async def process_question(request: Request, response: Response,) -> JSONRespons
 
         # 새로운 세션 생성
         session_id = str(uuid.uuid4())  # 세션 아이디 생성
-        sessions[session_id] = {"count": 0, "response_list": combined_response.service, "summary": combined_response.summary}
+        sessions[session_id] = {"count": 0, "response_list": list(combined_response.service), "summary": combined_response.summary}
         new_session = True
-        logger.info("✔ 새로운 세션 생성 : {}".format(session_id))
+        logger.info("✔ 새로운 세션 생성 : %s", session_id)
     else:
-        logger.info(f"✔ 기존 세션 사용 : {session_id}")
+        logger.info("✔ 기존 세션 사용 : %s", session_id)
         previous_count = sessions[session_id]["count"]
         previous_hints = sessions[session_id]["response_list"][previous_count - 1].text.hints
         # 이전 힌트와 관련된 질문인지 검사
@@ -53,7 +62,7 @@ async def process_question(request: Request, response: Response,) -> JSONRespons
     # 4) 카운트 증가 및 인덱스 계산
     sessions[session_id]["count"] += 1
     count = sessions[session_id]["count"]
-    logger.info(f"✔ 세션 카운트 [{session_id}]: {count}")
+    logger.info("✔ 세션 카운트 [%s]: %d", session_id, count)
 
     idx = count - 1
     response_list_ = sessions[session_id]["response_list"]
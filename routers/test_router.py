@@ -9,6 +9,8 @@ from schemas import QuestionRequest
 from services.chroma_service import find_k_documents, is_answer_related_to_hints
 from services.main_prompt_service import generate_service_responses, generate_summary_response, \
     generate_summary_response_test
+from services.admission import set_llm_priority, PRIORITY_DEBUG, chat_gpt_admission
+from services.llm_cache import run_cache_first
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -18,14 +20,15 @@ async def process_question(request: Request, response: Response,) -> JSONRespons
     # 1) 파싱
     qreq = await convert_request(request)
     question = qreq.question
+    set_llm_priority(PRIORITY_DEBUG)
 
     k_docs = find_k_documents(question)
-    response_list = generate_service_responses(question, k_docs)
+    response_list = await run_cache_first(chat_gpt_admission, generate_service_responses, question, k_docs)
     if not response_list:
         logger.info("✖ 관련된 답변을 찾을 수 없음")
         raise BadRequestException("한국사와 관련된 질문을 해줘!")
 
-    summary = generate_summary_response_test(response_list)
+    summary = await run_cache_first(chat_gpt_admission, generate_summary_response_test, response_list)
     return JSONResponse(
         content={
             "responses": [r.model_dump() for r in response_list],
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
 
 
 class ChatRequest(BaseModel):
@@ -49,3 +49,27 @@ class SummaryResponse(BaseModel):
 class ResponseWrapper(BaseModel):
     service: List[ServiceResponse]
     summary: SummaryResponse
+
+class ReindexRequest(BaseModel):
+    # 재색인은 서버에서 스레드·메모리를 쓰므로 값 범위를 제한한다
+    strategy: Literal["line", "sentence_window", "token"] = "line"
+    window: int = Field(3, ge=1, le=20)            # sentence_window: 묶을 문장 수
+    stride: int = Field(2, ge=1, le=20)            # sentence_window: 이동 문장 수
+    chunk_tokens: int = Field(256, ge=16, le=512)  # token: 청크당 토큰 수 (KoE5 최대 입력 512)
+    overlap: int = Field(32, ge=0, le=256)         # token: 겹치는 토큰 수
+    batch_size: int = Field(64, ge=1, le=512)
+    workers: int = Field(4, ge=1, le=16)
+    # HNSW 설정. 비워 두면 서버의 HNSW_* 환경 변수 설정을 따른다
+    space: Optional[Literal["l2", "cosine", "ip"]] = None  # 거리 함수
+    m: Optional[int] = Field(None, ge=2, le=128)
+    ef_construction: Optional[int] = Field(None, ge=8, le=1024)
+    ef_search: Optional[int] = Field(None, ge=1, le=1024)
+    # 교과서 간 거의 같은 문장을 하나로 합침. 비워 두면 DEDUP_ENABLED / DEDUP_THRESHOLD 를 따른다
+    dedup: Optional[bool] = None
+    dedup_threshold: Optional[float] = Field(None, gt=0.0, le=1.0)  # 중복으로 볼 코사인 유사도
+
+    @model_validator(mode="after")
+    def check_overlap(self):
+        if self.overlap >= self.chunk_tokens:
+            raise ValueError("overlap 은 chunk_tokens 보다 작아야 함")
+        return self
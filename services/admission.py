@@ -0,0 +1,243 @@
+import os
+import math
+import asyncio
+import time
+import heapq
+import logging
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from exception_handler import TooManyRequestsException, ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 우선순위 (작을수록 먼저)
+PRIORITY_SESSION = 0  # /question 세션 시작
+PRIORITY_NORMAL = 1
+PRIORITY_DEBUG = 2    # /test, /llm/* 같은 디버그용 엔드포인트
+
+# 현재 요청의 LLM 호출 우선순위. 라우터에서 set_llm_priority 로 지정한다.
+_llm_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_NORMAL)
+
+
+def set_llm_priority(priority: int):
+    _llm_priority.set(priority)
+
+
+def get_llm_priority() -> int:
+    return _llm_priority.get()
+
+
+# 현재 컨텍스트가 이미 슬롯을 잡고 있는 컨트롤러 이름.
+# 이벤트 루프에서 슬롯을 잡은 뒤 스레드풀로 넘긴 작업 안의 slot() 은 자리를 다시 잡지 않는다.
+_held: ContextVar[frozenset] = ContextVar("admission_held", default=frozenset())
+
+
+class _Waiter:
+    __slots__ = ("start", "granted", "event", "future", "loop")
+
+    def __init__(self, start: float, event: threading.Event = None, future: asyncio.Future = None,
+                 loop: asyncio.AbstractEventLoop = None):
+        self.start = start
+        self.granted = False
+        self.event = event
+        self.future = future
+        self.loop = loop
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """
+    동시에 실행되는 LLM 호출 수를 제한하고, 넘치는 호출은 우선순위 순으로 대기시킨다.
+    대기열이 가득 차면 즉시 429, 최대 대기 시간을 넘기면 503 을 낸다.
+
+    라우터에서는 run_in_threadpool() 로 이벤트 루프에서 자리를 먼저 잡은 뒤 스레드풀에 넘긴다
+    (캐시된 응답으로 끝날 수 있는 작업은 llm_cache.run_cache_first 를 거친다).
+    스레드 안에서 기다리면 anyio 스레드 제한(기본 40개)이 우선순위·거절 없는 진짜 대기열이 되기 때문이다.
+    자리가 나면 release() 가 다음 대기자에게 바로 넘겨주므로, 스레드(slot)와 코루틴(async_slot) 대기자가 섞여도 된다.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._queue = []  # (priority, seq, _Waiter) 힙
+        self._seq = itertools.count()
+        self._in_use = 0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._waits = deque(maxlen=1000)
+        self._avg_hold = 1.0  # 슬롯 한 번의 평균 점유 시간(초), Retry-After 추정용
+
+    def _retry_after(self) -> int:
+        backlog = len(self._queue) + 1
+        return max(1, math.ceil(self._avg_hold * backlog / self.max_concurrency))
+
+    def _admit_or_enqueue(self, priority: int, waiter: _Waiter) -> bool:
+        """(lock 안에서) 바로 들어가면 True, 아니면 대기열에 넣고 False. 가득 찼으면 429"""
+        if self._in_use < self.max_concurrency and not self._queue:
+            self._in_use += 1
+            self.admitted += 1
+            self._waits.append(0.0)
+            return True
+
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            logger.warning("✖ [%s] 대기열 가득 참 (%d개) — 요청 거절", self.name, len(self._queue))
+            raise TooManyRequestsException("요청이 너무 많아. 잠시 후 다시 시도해줘!", self._retry_after())
+
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        return False
+
+    def _grant_next(self):
+        """(lock 안에서) 빈 자리를 우선순위가 가장 높은 대기자에게 넘김"""
+        while self._queue and self._in_use < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._queue)
+            waiter.granted = True
+            self._in_use += 1
+            self.admitted += 1
+            self._waits.append(time.monotonic() - waiter.start)
+            if waiter.event is not None:
+                waiter.event.set()
+            else:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """
+        (lock 안에서) 대기를 포기. 그 사이 이미 자리를 받았으면 True.
+        """
+        if waiter.granted:
+            return True
+        self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+        heapq.heapify(self._queue)
+        return False
+
+    def _timeout(self):
+        self.timeouts += 1
+        logger.warning("✖ [%s] %.1f초 대기 초과", self.name, self.max_wait)
+        return ServiceUnavailableException("지금은 답변하기 어려워. 잠시 후 다시 시도해줘!", self._retry_after())
+
+    def acquire(self, priority: int = None):
+        """스레드에서 자리가 날 때까지 대기"""
+        priority = get_llm_priority() if priority is None else priority
+        waiter = _Waiter(time.monotonic(), event=threading.Event())
+        with self._lock:
+            if self._admit_or_enqueue(priority, waiter):
+                return
+        if waiter.event.wait(self.max_wait):
+            return
+        with self._lock:
+            if not self._abandon(waiter):
+                raise self._timeout()
+
+    async def acquire_async(self, priority: int = None):
+        """이벤트 루프에서 자리가 날 때까지 대기 (스레드를 점유하지 않음)"""
+        priority = get_llm_priority() if priority is None else priority
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(time.monotonic(), future=loop.create_future(), loop=loop)
+        with self._lock:
+            if self._admit_or_enqueue(priority, waiter):
+                return
+        try:
+            await asyncio.wait_for(waiter.future, self.max_wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not self._abandon(waiter):
+                    raise self._timeout()
+        except BaseException:
+            # 대기 중 취소됐어도 그 사이 자리를 받았다면 돌려준다
+            with self._lock:
+                granted = self._abandon(waiter)
+            if granted:
+                self.release(0.0)
+            raise
+
+    def release(self, held: float):
+        with self._lock:
+            self._in_use -= 1
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+            self._grant_next()
+
+    @contextmanager
+    def slot(self, priority: int = None):
+        if self.name in _held.get():
+            yield
+            return
+        self.acquire(priority)
+        token = _held.set(_held.get() | {self.name})
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            _held.reset(token)
+            self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int = None):
+        if self.name in _held.get():
+            yield
+            return
+        await self.acquire_async(priority)
+        token = _held.set(_held.get() | {self.name})
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            _held.reset(token)
+            self.release(time.monotonic() - start)
+
+    async def run_in_threadpool(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        이벤트 루프에서 자리를 잡은 뒤 fn 을 스레드풀에서 실행.
+        fn 안에서 부르는 slot() 은 이미 잡은 자리를 그대로 쓴다 (contextvar 가 스레드로 전달됨).
+        """
+        async with self.async_slot():
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "in_use": self._in_use,
+                "queue_depth": len(self._queue),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                "avg_hold": self._avg_hold,
+            }
+
+
+# 배포 환경마다 환경 변수로 조정
+chat_gpt_admission = AdmissionController(
+    "chat-gpt",
+    max_concurrency=int(os.getenv("LLM_CHAT_GPT_MAX_CONCURRENCY", "16")),
+    max_queue=int(os.getenv("LLM_CHAT_GPT_MAX_QUEUE", "64")),
+    max_wait=float(os.getenv("LLM_CHAT_GPT_MAX_WAIT", "30")),
+)
+lg_ai_admission = AdmissionController(
+    "lg-ai",
+    max_concurrency=int(os.getenv("LLM_LG_AI_MAX_CONCURRENCY", "1")),
+    max_queue=int(os.getenv("LLM_LG_AI_MAX_QUEUE", "8")),
+    max_wait=float(os.getenv("LLM_LG_AI_MAX_WAIT", "60")),
+)
@@ -1,13 +1,24 @@
+import os
 import logging
 
 from exception_handler import BadRequestException
 
 logger = logging.getLogger(__name__)
 
-from services.chroma_utils import find_k_docs, is_similar
+from services.chroma_utils import find_k_docs, is_similar, active_collection_space, distance_to_similarity
 
-def find_k_documents(question: str, k:int = 3, threshold:float = 0.2) -> list:
-    logger.info(f"▶ 주제 관련성 검사 시작: 질문 - '{question}', K - {k}, 임계값 - {threshold}")
+# 상위 K개 문서의 평균 코사인 유사도가 이보다 낮으면 한국사와 무관한 질문으로 본다.
+# E5 계열 임베딩은 무관한 문장끼리도 0.7~0.8 근처에 몰리므로 (예전 거리 척도 기준값 0.2 는 항상 통과)
+# 그 위쪽에서 자른다. 실제 질문 로그로 다시 맞출 수 있게 환경 변수로 둔다.
+RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "0.8"))
+
+def find_k_documents(question: str, k:int = 3, threshold:float = RELEVANCE_THRESHOLD) -> list:
+    _, documents = find_k_documents_with_ids(question, k, threshold)
+    return documents
+
+def find_k_documents_with_ids(question: str, k:int = 3, threshold:float = RELEVANCE_THRESHOLD) -> tuple[list, list]:
+    """find_k_documents 와 같지만 검색된 문서 ID 도 함께 반환"""
+    logger.info("▶ 주제 관련성 검사 시작: 질문 - '%s', K - %d, 임계값 - %s", question, k, threshold)
 
     # K개의 문서 검색
     k_docs = find_k_docs(question, k)
@@ -17,22 +28,24 @@ def find_k_documents(question: str, k:int = 3, threshold:float = 0.2) -> list:
         logger.info("✖ 관련 문서 없음")
         raise BadRequestException("한국사와 관련된 질문을 해줘!")
 
-    # 유사도 평균 계산
+    # 유사도 평균 계산 (컬렉션의 거리 함수에 맞춰 거리 → 유사도 변환)
     distances = k_docs.get('distances', [[]])[0]
-    avg_similarity = sum(distances) / len(distances)
-    logger.info(f"  • 평균 유사도: {avg_similarity:.4f}")
+    space = active_collection_space()
+    avg_similarity = sum(distance_to_similarity(d, space) for d in distances) / len(distances)
+    logger.info("  • 평균 유사도: %.4f", avg_similarity)
     if avg_similarity < threshold :
         logger.info("✖ 주제 관련성 부족")
         raise BadRequestException("한국사와 관련된 질문을 해줘!")
 
-    return documents
+    ids = k_docs.get('ids', [[]])[0]
+    return ids, documents
 
 def is_answer_related_to_hints(hints: list[str], additional_answer: str, threshold:float = 0.5) -> bool:
     joined_hints = " ".join(hints)
-    logger.info(f"▶ 힌트 관련성 검사 시작: 힌트 - '{joined_hints}', 추가 답변 - '{additional_answer}', 임계값 - {threshold}")
+    logger.info("▶ 힌트 관련성 검사 시작: 힌트 - '%s', 추가 답변 - '%s', 임계값 - %s", joined_hints, additional_answer, threshold)
 
     # 두 질문을 임베딩 한 값의 유사도 비교
     is_related = is_similar(joined_hints, additional_answer, threshold)
-    logger.info(f"✔ 관련성 검사 완료: {'관련 있음' if is_related else '관련 없음'}")
+    logger.info("✔ 관련성 검사 완료: %s", '관련 있음' if is_related else '관련 없음')
 
     return is_related
\ No newline at end of file
@@ -1,103 +1,235 @@
 import os
 import glob
+import time
 import logging
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 
-import chromadb
-from chromadb.config import Settings
 from chromadb.errors import NotFoundError
 from sentence_transformers import SentenceTransformer
 from sentence_transformers.util import cos_sim
 
+from services.chunking import load_chunks
+from services.dedup import DEDUP_ENABLED, DEDUP_THRESHOLD, collapse_near_duplicates
+from services.era_router import EraRouter, ERA_ROUTING_ENABLED, era_filter
+from services.client_registry import get_chroma_client, get_collection, with_collection
+
 logger = logging.getLogger(__name__)
 
 # 전역 설정
 COLLECTION_NAME = "k-history"
 EMBED_MODEL_NAME = "nlpai-lab/KoE5"
-CHROMA_HOST = "localhost"
-CHROMA_PORT = 8000
-
-# Chroma 클라이언트 및 임베딩 모델 준비
-client = chromadb.HttpClient(
-    host=CHROMA_HOST,
-    port=CHROMA_PORT,
-    settings=Settings(anonymized_telemetry=False, allow_reset=False)
-)
+DATA_GLOB = "data/*.txt"
+EMBED_BATCH_SIZE = 64
+
+# HNSW 인덱스 설정 (컬렉션 생성 시에만 적용되므로, 바꾸려면 재색인 필요)
+# 기본값은 Chroma 기본값과 같다. space: l2(제곱 L2) | cosine | ip
+HNSW_SPACE = os.getenv("HNSW_SPACE", "l2")
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "100"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "10"))
+
+# 재색인(blue/green) 시 현재 읽을 컬렉션 이름을 담아 두는 빈 컬렉션.
+# metadata = {"active": 읽기 대상 컬렉션, "previous": 롤백용 이전 버전,
+#             "reindexing"/"reindexing_since": 진행 중인 재색인 잠금, "reindex_status": 마지막 재색인 상태(JSON)}
+ALIAS_COLLECTION_NAME = f"{COLLECTION_NAME}-alias"
+ACTIVE_COLLECTION_TTL = float(os.getenv("ACTIVE_COLLECTION_TTL", "5"))
+_active = {"name": None, "checked_at": 0.0}
+
+# 읽기 대상 컬렉션별 시대 라우터 (컬렉션이 바뀌면 다시 만든다)
+_era_router = {"name": None, "router": None}
+
+# 임베딩 모델 준비 (Chroma 클라이언트는 client_registry 에서 한 번만 생성)
 embed_model = SentenceTransformer(EMBED_MODEL_NAME)
 
-def init_chroma():
-    """애플리케이션 시작 시 ChromaDB에 컬렉션을 초기화"""
-    logger.info(f"▶ ChromaDB 초기화 시작: '{COLLECTION_NAME}' 컬렉션 확인")
+def hnsw_metadata(space: str = HNSW_SPACE, m: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                  ef_search: int = HNSW_EF_SEARCH) -> dict:
+    """create_collection 에 넘길 HNSW 설정 metadata"""
+    if space not in ("l2", "cosine", "ip"):
+        raise ValueError(f"알 수 없는 거리 함수: {space}")
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": ef_construction,
+        "hnsw:search_ef": ef_search,
+    }
+
+def collection_space(collection) -> str:
+    """컬렉션에 적용된 거리 함수 (metadata 에 없으면 Chroma 기본값 l2)"""
+    return (collection.metadata or {}).get("hnsw:space", "l2")
+
+def active_collection_space() -> str:
+    # 캐시된 컬렉션 핸들의 metadata 만 읽으므로 추가 요청 없음
+    return with_active_collection(collection_space)
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """
+    Chroma 가 돌려준 거리를 코사인 유사도 척도로 변환.
+    l2 는 제곱 L2 거리이며, 임베딩이 단위 벡터(E5 계열 출력)라고 가정한다.
+    """
+    if space == "l2":
+        return 1.0 - distance / 2.0
+    # cosine: 1 - cos, ip: 1 - dot
+    return 1.0 - distance
+
+def read_alias() -> dict:
+    """별칭 컬렉션의 metadata (없으면 빈 dict)"""
     try:
-        client.get_collection(name=COLLECTION_NAME)
-        logger.info(f"✔ 컬렉션 '{COLLECTION_NAME}' 이미 존재 — 초기화 스킵")
+        alias = get_chroma_client().get_collection(name=ALIAS_COLLECTION_NAME)
     except NotFoundError:
-        logger.info(f"✚ 컬렉션 '{COLLECTION_NAME}' 미발견 — 새로 생성")
-        collection = client.create_collection(name=COLLECTION_NAME)
-
-        # data/ 폴더 내 모든 .txt 파일을 읽어서 docs 리스트에 저장
-        txt_files = glob.glob("data/*.txt")
-        docs: List[str] = []
-        metadatas: List[Dict[str, str]] = []
-
-        logger.info(f"  • 로드할 텍스트 파일 개수: {len(txt_files)}개")
-        for path in txt_files:
-            filename = os.path.basename(path)
-            logger.info(f"    – 파일 읽기 시작: {filename}")
-            with open(path, encoding="utf-8") as f:
-                lines = [line.strip() for line in f if line.strip()]
-            docs.extend(lines)
-            metadatas.extend([{"source": filename}] * len(lines))
-            logger.info(f"    – '{filename}'에서 {len(lines)}개 문장 로드 완료")
-
-        logger.info(f"  • 총 문장 수: {len(docs)}개")
-        logger.info(f"  • 총 메타데이터 수: {len(metadatas)}개")
-
-        # 임베딩
-        logger.info("  • 임베딩 생성 중…")
-        embs = embed_model.encode(docs).tolist()
-        logger.info("  • 임베딩 생성 완료")
-
-        # 컬렉션에 추가
-        ids = [str(i) for i in range(len(docs))] # 각 문서에 대한 고유 ID 생성
-
-        logger.info(f"  • ChromaDB에 {len(docs)}개 문서 저장 중…")
+        return {}
+    return dict(alias.metadata or {})
+
+def update_alias(**fields) -> dict:
+    """
+    별칭 metadata 의 일부 항목만 바꿔 한 번에 다시 쓴다 (값이 None 인 항목은 지움).
+    modify() 는 metadata 를 통째로 교체하므로 나머지 항목은 읽어서 그대로 유지한다.
+    """
+    metadata = read_alias()
+    metadata.update(fields)
+    metadata = {key: value for key, value in metadata.items() if value is not None}
+    alias = get_chroma_client().get_or_create_collection(name=ALIAS_COLLECTION_NAME, metadata=metadata)
+    alias.modify(metadata=metadata)
+    return metadata
+
+def write_alias(active: str, previous: str = None):
+    """읽기 대상 컬렉션을 한 번의 metadata 변경으로 전환"""
+    update_alias(active=active, previous=previous or None)
+    _active["name"] = active
+    _active["checked_at"] = time.monotonic()
+    logger.info("✔ 읽기 대상 컬렉션 전환: %s (이전: %s)", active, previous)
+
+def active_collection_name(force: bool = False) -> str:
+    """현재 읽기 대상 컬렉션 이름 (다른 워커의 전환도 TTL 안에 반영)"""
+    now = time.monotonic()
+    if force or _active["name"] is None or now - _active["checked_at"] > ACTIVE_COLLECTION_TTL:
+        _active["name"] = read_alias().get("active", COLLECTION_NAME)
+        _active["checked_at"] = now
+    return _active["name"]
+
+def with_active_collection(fn):
+    """읽기 대상 컬렉션으로 fn 실행. 그 사이 전환·삭제됐으면 별칭을 다시 읽고 한 번 재시도"""
+    try:
+        return with_collection(active_collection_name(), fn)
+    except NotFoundError:
+        return with_collection(active_collection_name(force=True), fn)
+
+def embed_documents(docs: List[str], batch_size: int = EMBED_BATCH_SIZE, workers: int = 1) -> List[List[float]]:
+    """문서를 batch_size 씩 나눠 workers 개 스레드로 임베딩 (순서 유지)"""
+    batches = [docs[i:i + batch_size] for i in range(0, len(docs), batch_size)]
+    encode = lambda batch: embed_model.encode(batch, batch_size=batch_size).tolist()
+    if workers <= 1:
+        results = [encode(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(encode, batches))
+    return [emb for batch in results for emb in batch]
+
+def build_collection(name: str, docs: List[str], metadatas: List[Dict[str, str]],
+                     batch_size: int = EMBED_BATCH_SIZE, workers: int = 1, hnsw: dict = None,
+                     dedup_threshold: Optional[float] = None):
+    """
+    새 컬렉션을 만들고 문서를 임베딩해 저장 (hnsw 가 없으면 HNSW_* 기본 설정).
+    dedup_threshold 를 주면 저장 전에 거의 같은 문서를 하나로 합친다.
+    반환: (컬렉션, 중복 정리 리포트 또는 None)
+    """
+    hnsw = hnsw or hnsw_metadata()
+    logger.info("  • HNSW 설정: %s", hnsw)
+    collection = get_chroma_client().create_collection(name=name, metadata=hnsw)
+
+    # 임베딩
+    logger.info("  • 임베딩 생성 중… (배치 %d, 워커 %d)", batch_size, workers)
+    embs = embed_documents(docs, batch_size, workers)
+    logger.info("  • 임베딩 생성 완료")
+
+    # 교과서 간 중복 문장 정리 (임베딩을 그대로 재사용)
+    report = None
+    if dedup_threshold is not None and docs:
+        docs, metadatas, embs, report = collapse_near_duplicates(docs, metadatas, embs, dedup_threshold)
+
+    # 컬렉션에 추가
+    ids = [str(i) for i in range(len(docs))] # 각 문서에 대한 고유 ID 생성
+
+    logger.info("  • ChromaDB '%s'에 %d개 문서 저장 중…", name, len(docs))
+    max_batch = get_chroma_client().get_max_batch_size()
+    for start in range(0, len(docs), max_batch):
+        end = start + max_batch
         collection.add(
-            embeddings=embs,
-            documents=docs,
-            metadatas=metadatas,
-            ids=ids
+            embeddings=embs[start:end],
+            documents=docs[start:end],
+            metadatas=metadatas[start:end],
+            ids=ids[start:end]
         )
-        logger.info("  • 문서 저장 완료")
+    logger.info("  • 문서 저장 완료")
+    return collection, report
+
+def init_chroma():
+    """애플리케이션 시작 시 ChromaDB에 컬렉션을 초기화"""
+    name = active_collection_name(force=True)
+    logger.info("▶ ChromaDB 초기화 시작: '%s' 컬렉션 확인", name)
+    try:
+        get_collection(name)
+        logger.info("✔ 컬렉션 '%s' 이미 존재 — 초기화 스킵", name)
+    except NotFoundError:
+        logger.info("✚ 컬렉션 '%s' 미발견 — 새로 생성", name)
+
+        # data/ 폴더 내 모든 .txt 파일을 한 줄 = 한 문서로 읽기
+        docs, metadatas = load_chunks(glob.glob(DATA_GLOB), "line")
+        logger.info("  • 총 문장 수: %d개", len(docs))
+        logger.info("  • 총 메타데이터 수: %d개", len(metadatas))
 
+        build_collection(name, docs, metadatas, dedup_threshold=DEDUP_THRESHOLD if DEDUP_ENABLED else None)
+
+    # 첫 요청이 기다리지 않도록 시대 라우터 미리 준비
+    get_era_router()
     logger.info("▶ ChromaDB 초기화 완료")
 
+def get_era_router():
+    """읽기 대상 컬렉션의 era 메타데이터와 임베딩으로 만든 라우터 (시대 태그가 없으면 None)"""
+    if not ERA_ROUTING_ENABLED:
+        return None
+    name = active_collection_name()
+    if _era_router["name"] != name:
+        data = with_active_collection(lambda collection: collection.get(include=["embeddings", "metadatas"]))
+        doc_eras = [(meta or {}).get("era") for meta in data["metadatas"]]
+        router = EraRouter.from_embeddings(data["embeddings"], doc_eras) if doc_eras else None
+        _era_router.update(name=name, router=router)
+        logger.info("✔ 시대 라우터 준비: %s (%s)", name, router.eras if router else "시대 태그 없음 — 전체 검색")
+    return _era_router["router"]
+
 def find_k_docs(query: str, k: int = 5) -> dict:
     """주어진 쿼리에 대해 상위 k개의 문서를 검색"""
-    logger.info(f"▶ ChromaDB에서 '{query}'에 대한 상위 {k}개 문서 검색")
+    logger.info("▶ ChromaDB에서 '%s'에 대한 상위 %d개 문서 검색", query, k)
 
     # 질문 임베딩
     q_emb = embed_model.encode([query]).tolist()[0]
 
-    collection = client.get_collection(name=COLLECTION_NAME)
-    results = collection.query(
+    # 질문이 속할 시대만 검색 (확신이 낮으면 전체 검색)
+    router = get_era_router()
+    eras = router.route(q_emb) if router else None
+    where = era_filter(eras)
+    logger.info("  • 검색 범위: %s", eras or "전체")
+
+    results = with_active_collection(lambda collection: collection.query(
         query_embeddings=[q_emb],
-        n_results=k
-    )
-    # 문서 내용 출력
-    docs_found = results['documents'][0]
-    metadatas_found = results['metadatas'][0]
-    for i, (doc, meta) in enumerate(zip(docs_found, metadatas_found)):
-        # meta 딕셔너리에서 'source' 키로 파일명을 가져옴
-        source_file = meta.get('source', '알 수 없음')
-        logger.info(f" 문서 {i+1} (출처: {source_file}): {doc}")
-
-    logger.info(f"✔ 검색 완료: {len(results['ids'][0])}개 문서")
+        n_results=k,
+        where=where
+    ))
+    # 문서 내용 출력 (verbose: 요청 단위로 샘플링됨)
+    if logger.isEnabledFor(logging.INFO):
+        docs_found = results['documents'][0]
+        metadatas_found = results['metadatas'][0]
+        for i, (doc, meta) in enumerate(zip(docs_found, metadatas_found)):
+            # meta 딕셔너리에서 'source' 키로 파일명을 가져옴 (중복 정리로 합쳐졌으면 'sources')
+            source_file = meta.get('sources') or meta.get('source', '알 수 없음')
+            logger.info(" 문서 %d (출처: %s): %s", i + 1, source_file, doc, extra={"verbose": True})
+
+    logger.info("✔ 검색 완료: %d개 문서", len(results['ids'][0]))
     return results
 
 def is_similar(doc1: str, doc2: str, threshold: float) -> bool:
     """두 문서 간의 유사도를 계산하고, threshold 이상인지 판단"""
-    logger.info(f"▶ '{doc1}'와 '{doc2}' 간 유사도 계산")
+    logger.info("▶ '%s'와 '%s' 간 유사도 계산", doc1, doc2, extra={"verbose": True})
 
     # 쿼리 임베딩
     doc1_emb, doc2_emb = embed_model.encode([doc1, doc2], convert_to_tensor=True)
@@ -105,8 +237,8 @@ def is_similar(doc1: str, doc2: str, threshold: float) -> bool:
     # 코사인 유사도 계산
     similarity_tensor = cos_sim(doc1_emb, doc2_emb)
     similarity = similarity_tensor.item()
-    logger.info(f"✔ 유사도 계산 완료: {similarity:.4f}")
+    logger.info("✔ 유사도 계산 완료: %.4f", similarity)
 
     is_similar_ = similarity >= threshold
-    logger.info(f"  • 유사도 임계값 비교: {'유사' if is_similar else '비유사'}")
+    logger.info("  • 유사도 임계값 비교: %s", '유사' if is_similar_ else '비유사')
     return is_similar_
\ No newline at end of file
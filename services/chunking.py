@@ -0,0 +1,74 @@
+import os
+import re
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from services.era_router import tag_eras
+
+logger = logging.getLogger(__name__)
+
+# 한국어 교과서 문장은 대부분 '다.', '요.' 등 마침표로 끝난다
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def chunk_lines(text: str, **_) -> List[str]:
+    """비어 있지 않은 한 줄 = 한 문서 (기존 방식)"""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def chunk_sentence_window(text: str, window: int = 3, stride: int = 2, **_) -> List[str]:
+    """문장 단위로 나눈 뒤 window 개씩 묶고, stride 만큼 이동"""
+    if window < 1 or stride < 1:
+        raise ValueError("window, stride 는 1 이상이어야 함")
+    sentences = [s.strip() for line in chunk_lines(text) for s in _SENTENCE_END.split(line) if s.strip()]
+    chunks = []
+    for start in range(0, len(sentences), stride):
+        chunks.append(" ".join(sentences[start:start + window]))
+        if start + window >= len(sentences):
+            break
+    return chunks
+
+
+def chunk_token_window(text: str, tokenizer=None, chunk_tokens: int = 256, overlap: int = 32, **_) -> List[str]:
+    """임베딩 모델 토크나이저 기준 chunk_tokens 개씩 자르고, overlap 만큼 겹치게 이동"""
+    if tokenizer is None:
+        raise ValueError("token 청킹에는 tokenizer 가 필요함")
+    if overlap >= chunk_tokens:
+        raise ValueError("overlap 은 chunk_tokens 보다 작아야 함")
+    ids = tokenizer.encode(" ".join(chunk_lines(text)), add_special_tokens=False)
+    chunks = []
+    step = chunk_tokens - overlap
+    for start in range(0, len(ids), step):
+        chunk = tokenizer.decode(ids[start:start + chunk_tokens]).strip()
+        if chunk:
+            chunks.append(chunk)
+        if start + chunk_tokens >= len(ids):
+            break
+    return chunks
+
+
+CHUNKERS: Dict[str, Callable[..., List[str]]] = {
+    "line": chunk_lines,
+    "sentence_window": chunk_sentence_window,
+    "token": chunk_token_window,
+}
+
+
+def load_chunks(paths: List[str], strategy: str = "line", **params) -> Tuple[List[str], List[Dict[str, str]]]:
+    """파일들을 읽어 청크와 메타데이터({"source": 파일명, "era": 시대}) 목록을 반환"""
+    if strategy not in CHUNKERS:
+        raise ValueError(f"알 수 없는 청킹 전략: {strategy} (가능: {', '.join(CHUNKERS)})")
+    chunker = CHUNKERS[strategy]
+
+    docs: List[str] = []
+    metadatas: List[Dict[str, str]] = []
+    logger.info("  • 로드할 텍스트 파일 개수: %d개 (청킹: %s)", len(paths), strategy)
+    for path in sorted(paths):
+        filename = os.path.basename(path)
+        logger.info("    – 파일 읽기 시작: %s", filename)
+        with open(path, encoding="utf-8") as f:
+            chunks = chunker(f.read(), **params)
+        docs.extend(chunks)
+        metadatas.extend([{"source": filename, "era": era} for era in tag_eras(chunks)])
+        logger.info("    – '%s'에서 %d개 청크 로드 완료", filename, len(chunks))
+    return docs, metadatas
@@ -0,0 +1,180 @@
+import os
+import logging
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+import chromadb
+import httpx
+from chromadb.config import Settings
+from chromadb.errors import NotFoundError
+from openai import OpenAI, AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ----------------------
+# 전역 설정 (환경 변수로 덮어쓰기 가능)
+# ----------------------
+# OPENAI_BASE_URL / CHROMA_HOST 를 로컬 스텁 서버로 바꾸면 외부 서비스 없이 테스트할 수 있다.
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "<KEY>")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+CHROMA_MAX_CONNECTIONS = int(os.getenv("CHROMA_MAX_CONNECTIONS", "20"))
+CHROMA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CHROMA_MAX_KEEPALIVE_CONNECTIONS", "10"))
+CHROMA_KEEPALIVE_SECS = float(os.getenv("CHROMA_KEEPALIVE_SECS", "30"))
+
+# 한 번 만든 클라이언트와 컬렉션 핸들을 프로세스 전체에서 재사용
+_lock = threading.Lock()
+_openai_client: Optional[OpenAI] = None
+_async_openai_client: Optional[AsyncOpenAI] = None
+_chroma_client = None
+_collections: Dict[str, object] = {}
+
+
+def _openai_timeout() -> httpx.Timeout:
+    return httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+
+
+def _openai_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_openai_client() -> OpenAI:
+    """커넥션 풀을 공유하는 동기 OpenAI 클라이언트를 반환"""
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                logger.info("▶ OpenAI 클라이언트 생성 (최대 연결 %d개)", OPENAI_MAX_CONNECTIONS)
+                _openai_client = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    base_url=OPENAI_BASE_URL,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    timeout=_openai_timeout(),
+                    http_client=httpx.Client(limits=_openai_limits(), timeout=_openai_timeout()),
+                )
+    return _openai_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """커넥션 풀을 공유하는 비동기 OpenAI 클라이언트를 반환"""
+    global _async_openai_client
+    if _async_openai_client is None:
+        with _lock:
+            if _async_openai_client is None:
+                logger.info("▶ AsyncOpenAI 클라이언트 생성 (최대 연결 %d개)", OPENAI_MAX_CONNECTIONS)
+                _async_openai_client = AsyncOpenAI(
+                    api_key=OPENAI_API_KEY,
+                    base_url=OPENAI_BASE_URL,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    timeout=_openai_timeout(),
+                    http_client=httpx.AsyncClient(limits=_openai_limits(), timeout=_openai_timeout()),
+                )
+    return _async_openai_client
+
+
+def get_chroma_client():
+    """커넥션 풀을 공유하는 Chroma HTTP 클라이언트를 반환"""
+    global _chroma_client
+    if _chroma_client is None:
+        with _lock:
+            if _chroma_client is None:
+                logger.info("▶ Chroma 클라이언트 생성: %s:%d", CHROMA_HOST, CHROMA_PORT)
+                _chroma_client = chromadb.HttpClient(
+                    host=CHROMA_HOST,
+                    port=CHROMA_PORT,
+                    settings=Settings(
+                        anonymized_telemetry=False,
+                        allow_reset=False,
+                        chroma_http_max_connections=CHROMA_MAX_CONNECTIONS,
+                        chroma_http_max_keepalive_connections=CHROMA_MAX_KEEPALIVE_CONNECTIONS,
+                        chroma_http_keepalive_secs=CHROMA_KEEPALIVE_SECS,
+                    )
+                )
+    return _chroma_client
+
+
+def get_collection(name: str):
+    """컬렉션 핸들을 캐시에서 꺼내고, 없으면 한 번만 조회해서 캐시"""
+    collection = _collections.get(name)
+    if collection is None:
+        collection = get_chroma_client().get_collection(name=name)
+        _collections[name] = collection
+    return collection
+
+
+def invalidate_collection(name: Optional[str] = None):
+    """캐시된 컬렉션 핸들을 버림 (name 이 없으면 전부)"""
+    if name is None:
+        _collections.clear()
+    else:
+        _collections.pop(name, None)
+
+
+def with_collection(name: str, fn: Callable[[object], T]) -> T:
+    """캐시된 컬렉션으로 fn 을 실행하고, NotFoundError 가 나면 핸들을 새로 받아 한 번 재시도"""
+    try:
+        return fn(get_collection(name))
+    except NotFoundError:
+        logger.info("✚ 컬렉션 '%s' 핸들 만료 — 새로 조회", name)
+        invalidate_collection(name)
+        return fn(get_collection(name))
+
+
+def health_check() -> dict:
+    """Chroma 와 OpenAI 연결 상태를 확인"""
+    status = {}
+    try:
+        get_chroma_client().heartbeat()
+        status["chroma"] = "ok"
+    except Exception as e:
+        logger.warning("✖ Chroma 헬스 체크 실패: %s", e)
+        status["chroma"] = "error"
+    try:
+        get_openai_client().with_options(timeout=OPENAI_CONNECT_TIMEOUT, max_retries=0).models.list()
+        status["openai"] = "ok"
+    except Exception as e:
+        logger.warning("✖ OpenAI 헬스 체크 실패: %s", e)
+        status["openai"] = "error"
+    return status
+
+
+def _close_chroma(client):
+    """Chroma 클라이언트의 System 참조를 놓고 HTTP 커넥션 풀(httpx.Client)을 닫는다"""
+    # System.stop() 은 FastAPI 서버 구현의 httpx 세션을 닫지 않으므로 세션은 직접 닫는다
+    session = getattr(getattr(client, "_server", None), "_session", None)
+    if hasattr(client, "close"):
+        client.close()
+    if session is not None:
+        session.close()
+
+
+async def close_clients():
+    """애플리케이션 종료 시 커넥션 풀 정리"""
+    global _openai_client, _async_openai_client, _chroma_client
+    with _lock:
+        sync_client, async_client, chroma_client = _openai_client, _async_openai_client, _chroma_client
+        _openai_client = None
+        _async_openai_client = None
+        _chroma_client = None
+        _collections.clear()
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.close()
+    if chroma_client is not None:
+        _close_chroma(chroma_client)
+    logger.info("✔ LLM/Chroma 클라이언트 정리 완료")
@@ -0,0 +1,108 @@
+import os
+import logging
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 교과서끼리 거의 같은 문장을 하나로 합치는 기준 (코사인 유사도)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.92"))
+# 무작위 초평면 LSH: band 마다 DEDUP_LSH_BITS 비트 서명이 같은 문서끼리만 비교 (O(n²) 회피).
+# 평균을 뺀 공간에서는 0.92 근처 중복 쌍의 코사인이 0.6~0.8 로 낮아지므로 band 당 비트를 줄이고 band 를 늘렸다.
+DEDUP_LSH_BANDS = int(os.getenv("DEDUP_LSH_BANDS", "48"))
+DEDUP_LSH_BITS = int(os.getenv("DEDUP_LSH_BITS", "12"))
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def near_duplicate_clusters(embeddings, threshold: float = DEDUP_THRESHOLD, bands: int = DEDUP_LSH_BANDS,
+                            bits: int = DEDUP_LSH_BITS, seed: int = 0) -> List[List[int]]:
+    """
+    코사인 유사도가 threshold 이상인 문서들을 묶은 클러스터 목록 (원래 순서 기준, 크기 1 포함).
+    같은 LSH 버킷에 들어간 문서끼리만 행렬곱으로 한 번에 유사도를 계산한다.
+    """
+    emb = np.asarray(embeddings, dtype=np.float32)
+    emb = emb / np.linalg.norm(emb, axis=1, keepdims=True)
+    n, dim = emb.shape
+    uf = _UnionFind(n)
+
+    # E5 계열 임베딩은 서로 무관한 문장끼리도 코사인이 0.7~0.8 로 한쪽에 몰려 있어,
+    # 그대로 해싱하면 대부분이 같은 버킷에 들어간다. 코퍼스 평균을 빼고 해싱한다 (유사도 계산은 원래 벡터로).
+    centered = emb - emb.mean(axis=0)
+    compared = 0
+
+    rng = np.random.default_rng(seed)
+    weights = 1 << np.arange(bits, dtype=np.int64)
+    for _ in range(bands):
+        planes = rng.standard_normal((dim, bits)).astype(np.float32)
+        codes = ((centered @ planes) > 0).astype(np.int64) @ weights
+
+        buckets: Dict[int, List[int]] = defaultdict(list)
+        for i, code in enumerate(codes):
+            buckets[int(code)].append(i)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            idx = np.array(members)
+            compared += len(members) * (len(members) - 1) // 2
+            sims = emb[idx] @ emb[idx].T
+            rows, cols = np.nonzero(np.triu(sims >= threshold, k=1))
+            for r, c in zip(rows, cols):
+                uf.union(int(idx[r]), int(idx[c]))
+
+    logger.debug("  • LSH 후보 비교 %d쌍 (전체 %d쌍)", compared, n * (n - 1) // 2)
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i in range(n):
+        clusters[uf.find(i)].append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def collapse_near_duplicates(docs: List[str], metadatas: List[Dict], embeddings,
+                             threshold: float = DEDUP_THRESHOLD) -> Tuple[List[str], List[Dict], list, dict]:
+    """
+    거의 같은 문서를 하나로 합친다. 가장 긴 문서를 대표로 남기고,
+    metadata 에 합쳐진 출처(sources, 쉼표 구분)와 합쳐진 개수(duplicates)를 기록한다.
+    반환: (문서, 메타데이터, 임베딩, 리포트)
+    """
+    clusters = near_duplicate_clusters(embeddings, threshold)
+
+    kept_docs, kept_metas, kept_idx = [], [], []
+    for members in clusters:
+        canonical = max(members, key=lambda i: len(docs[i]))
+        meta = dict(metadatas[canonical])
+        if len(members) > 1:
+            meta["sources"] = ",".join(sorted({metadatas[i]["source"] for i in members}))
+            meta["duplicates"] = len(members) - 1
+        kept_docs.append(docs[canonical])
+        kept_metas.append(meta)
+        kept_idx.append(canonical)
+
+    kept_embs = [embeddings[i] for i in kept_idx]
+    report = {
+        "before": len(docs),
+        "after": len(kept_docs),
+        "merged_clusters": sum(1 for members in clusters if len(members) > 1),
+        "reduction": 1 - len(kept_docs) / len(docs) if docs else 0.0,
+        "threshold": threshold,
+    }
+    logger.info("✔ 중복 문서 정리: %d개 → %d개 (%.1f%% 감소, 병합 클러스터 %d개)",
+                report["before"], report["after"], report["reduction"] * 100, report["merged_clusters"])
+    return kept_docs, kept_metas, kept_embs, report
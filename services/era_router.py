@@ -0,0 +1,106 @@
+import os
+import re
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 시대 구분 (교과서 서술 순서)
+ERAS = ["선사", "삼국", "고려", "조선", "근현대"]
+
+# 문서 시대 태깅용 키워드. '고조선'이 '조선'으로 잡히지 않도록 조선은 앞 글자를 확인하고,
+# 근대의 '삼국 간섭'(1895)은 삼국 시대로 잡히지 않도록 뺀다. 을사는 을사사화(조선)와 구분한다.
+# 동학은 4부 학당(동학·서학…)과 겹치므로 '동학 농민'으로만 잡고, 1870년 이후 연도도 근현대 단서로 쓴다.
+ERA_KEYWORDS = {
+    "선사": [r"구석기", r"신석기", r"청동기", r"철기", r"선사", r"고조선", r"단군", r"위만", r"고인돌", r"빗살무늬"],
+    "삼국": [r"삼국(?! ?간섭)", r"고구려", r"백제", r"신라", r"가야", r"발해", r"남북국", r"부여", r"옥저", r"동예",
+           r"삼한", r"이두", r"향찰"],
+    "고려": [r"고려", r"왕건", r"무신", r"거란", r"몽골", r"공민왕", r"원 간섭"],
+    "조선": [r"(?<!고)조선", r"세종", r"훈민정음", r"사림", r"임진왜란", r"병자호란", r"실학", r"탕평"],
+    "근현대": [r"개항", r"개화", r"흥선 ?대원군", r"갑신정변", r"동학 ?농민", r"갑오", r"을미", r"아관 ?파천", r"독립 ?협회",
+            r"독립 ?신문", r"광무", r"을사 ?(?:조약|늑약)", r"일제", r"대한 ?제국", r"대한민국", r"광복",
+            r"독립 ?운동", r"3·1 ?운동", r"임시 ?정부", r"총독부", r"6·25",
+            r"(?<![\d~])(?<!기원전 )(?:18[7-9]\d|19\d\d)(?!\d)"],
+}
+_ERA_PATTERNS = {era: [re.compile(word) for word in words] for era, words in ERA_KEYWORDS.items()}
+
+# 라우팅 설정
+# where 필터는 라우팅이 틀리면 바로 recall 손실이므로 기본은 꺼 둔다.
+# 켜기 전에 python -m benchmarks.era_sharding 으로 where / flat recall 을 확인할 것.
+ERA_ROUTING_ENABLED = os.getenv("ERA_ROUTING_ENABLED", "0") == "1"
+ERA_ROUTER_TEMPERATURE = float(os.getenv("ERA_ROUTER_TEMPERATURE", "0.02"))
+ERA_ROUTER_MIN_CONFIDENCE = float(os.getenv("ERA_ROUTER_MIN_CONFIDENCE", "0.5"))  # 1순위 확률이 이보다 낮으면 전체 검색
+ERA_ROUTER_COVERAGE = float(os.getenv("ERA_ROUTER_COVERAGE", "0.8"))              # 누적 확률이 이만큼 될 때까지 시대 추가
+ERA_ROUTER_MAX_ERAS = int(os.getenv("ERA_ROUTER_MAX_ERAS", "2"))
+
+
+def tag_eras(chunks: List[str], start_era: str = ERAS[0]) -> List[str]:
+    """
+    교과서 청크 목록에 순서대로 시대를 붙인다.
+    키워드가 가장 많이 나온 시대를 쓰고(동률이면 뒤 시대), 키워드가 없으면 앞 청크의 시대를 이어받는다.
+    근대 서술에 나라 이름 '조선'이 여러 번 나와도 쏠리지 않도록 키워드 하나는 최대 3번까지만 센다.
+    """
+    eras = []
+    current = start_era
+    for chunk in chunks:
+        counts = [sum(min(len(pattern.findall(chunk)), 3) for pattern in _ERA_PATTERNS[era]) for era in ERAS]
+        best = max(counts)
+        if best > 0:
+            current = ERAS[max(i for i, c in enumerate(counts) if c == best)]
+        eras.append(current)
+    return eras
+
+
+class EraRouter:
+    """시대별 문서 임베딩 중심점과의 유사도로 쿼리가 속할 시대를 예측"""
+
+    def __init__(self, eras: List[str], centroids: np.ndarray):
+        self.eras = eras
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    @classmethod
+    def from_embeddings(cls, embeddings, doc_eras: List[Optional[str]]) -> Optional["EraRouter"]:
+        """컬렉션의 임베딩과 era 메타데이터로 만든다. 시대 태그가 없는(예전) 컬렉션이면 None"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        eras, centroids = [], []
+        for era in ERAS:
+            mask = np.array([e == era for e in doc_eras], dtype=bool)
+            if mask.any():
+                eras.append(era)
+                centroids.append(embeddings[mask].mean(axis=0))
+        if len(eras) < 2:
+            return None
+        return cls(eras, np.stack(centroids))
+
+    def probabilities(self, query_emb) -> np.ndarray:
+        q = np.asarray(query_emb, dtype=np.float32)
+        sims = self.centroids @ (q / np.linalg.norm(q))
+        logits = (sims - sims.max()) / ERA_ROUTER_TEMPERATURE
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def route(self, query_emb) -> Optional[List[str]]:
+        """검색할 시대 목록. 확신이 낮으면 None (전체 검색)"""
+        probs = self.probabilities(query_emb)
+        order = np.argsort(-probs)
+        if probs[order[0]] < ERA_ROUTER_MIN_CONFIDENCE:
+            return None
+
+        selected, covered = [], 0.0
+        for i in order[:ERA_ROUTER_MAX_ERAS]:
+            selected.append(self.eras[i])
+            covered += probs[i]
+            if covered >= ERA_ROUTER_COVERAGE:
+                break
+        return selected
+
+
+def era_filter(eras: Optional[List[str]]) -> Optional[dict]:
+    """Chroma where 필터 (None 이면 전체 검색)"""
+    if not eras:
+        return None
+    if len(eras) == 1:
+        return {"era": eras[0]}
+    return {"era": {"$in": eras}}
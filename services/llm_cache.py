@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextvars import ContextVar
+from functools import partial
+from typing import Callable, Optional, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from exception_handler import InternalServerException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 모드
+#   off    : 캐시 사용 안 함
+#   on     : 캐시에 있으면 사용, 없으면 호출 후 저장
+#   record : 항상 실제 호출하고 결과를 저장 (녹화)
+#   replay : 캐시에서만 응답, 없으면 오류 (네트워크 없이 결정적으로 실행)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "on")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# True 인 동안 cached() 는 LLM 을 부르지 않고, 캐시에 쓸 응답이 없으면 LLMCacheMiss 를 낸다
+_cache_only: ContextVar[bool] = ContextVar("llm_cache_only", default=False)
+
+
+class LLMCacheMiss(Exception):
+    """cache_only 실행 중 LLM 호출이 필요해진 경우"""
+
+
+def cache_key(provider: str, model: str, messages: list, params: dict) -> str:
+    """provider, model, messages, 생성 파라미터로 만든 내용 기반 키"""
+    raw = json.dumps(
+        {"provider": provider, "model": model, "messages": messages, "params": params},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite 기반 LLM 응답 캐시. 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 지운다."""
+
+    def __init__(self, path: str, mode: str = "on", max_bytes: int = LLM_CACHE_MAX_BYTES):
+        if mode not in ("off", "on", "record", "replay"):
+            raise ValueError(f"알 수 없는 LLM 캐시 모드: {mode}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, provider TEXT, model TEXT, response TEXT,"
+                " size INTEGER, created_at REAL, last_access REAL, hits INTEGER DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+            self._conn = conn
+            logger.info("▶ LLM 캐시 열기: %s (모드: %s, %d bytes)", self.path, self.mode, self._size(conn))
+        return self._conn
+
+    @staticmethod
+    def _size(conn: sqlite3.Connection) -> int:
+        # 같은 파일을 여러 워커 프로세스가 같이 쓰므로 전체 크기는 매번 DB 에서 센다
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def _record_hit(self, key: str):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+
+    def _record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, key: str, provider: str, model: str, response: str):
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, response, size, created_at, last_access, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, provider, model, response, size, now, now)
+            )
+            self.stores += 1
+            # INSERT 로 잡은 쓰기 잠금이 commit 까지 유지되므로 다른 프로세스의 저장과 섞이지 않는다
+            total = self._size(conn)
+            if total > self.max_bytes:
+                self._evict(conn, total)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, total: int):
+        # 최대 크기의 90% 까지 가장 오래 안 쓴 항목부터 삭제
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= target:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+        logger.info("  • LLM 캐시 정리: %d bytes 남음", self._size(conn))
+
+    def _usable(self, response: str, cacheable: Optional[Callable[[str], bool]]) -> bool:
+        # replay 는 녹화된 응답을 그대로 재현해야 하므로 검증하지 않음
+        return self.mode == "replay" or cacheable is None or cacheable(response)
+
+    def _storable(self, response: Optional[str], cacheable: Optional[Callable[[str], bool]]) -> bool:
+        # record 는 'no' 같은 응답도 그대로 녹화, on 은 호출한 쪽 검증을 통과한 응답만 저장
+        return response is not None and (self.mode == "record" or cacheable is None or cacheable(response))
+
+    def _lookup(self, provider: str, model: str, messages: list, params: dict, refresh: bool,
+                cacheable: Optional[Callable[[str], bool]]):
+        key = cache_key(provider, model, messages, params)
+        if not (self.mode == "replay" or (self.mode == "on" and not refresh)):
+            return key, None
+        cached = self.get(key)
+        # 검증을 통과해 실제로 쓰는 응답만 적중으로 센다 (버려지는 항목은 미적중)
+        if cached is not None and self._usable(cached, cacheable):
+            self._record_hit(key)
+            return key, cached
+        # cache_only 미적중은 곧 같은 조회를 다시 하므로 그쪽에서만 센다
+        if not _cache_only.get():
+            self._record_miss()
+        if self.mode == "replay":
+            logger.error("✖ LLM 캐시 replay 모드에서 미적중: %s/%s", provider, model)
+            raise InternalServerException("LLM 캐시에 저장된 응답이 없습니다 (replay 모드).")
+        return key, None
+
+    def cached(self, provider: str, model: str, messages: list, params: dict, fetch: Callable[[], str],
+               refresh: bool = False, cacheable: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        캐시 모드에 따라 응답을 캐시에서 꺼내거나 fetch() 로 받아 저장.
+        refresh=True 면 (replay 모드가 아닐 때) 캐시를 건너뛰고 새로 받아 덮어쓴다 — 잘못된 응답 재시도용.
+        cacheable 을 주면 그 검증을 통과한 응답만 저장·사용한다 ('no' 거절이나 형식이 틀린 응답이
+        캐시에 남아 같은 질문마다 계속 재현되지 않도록).
+        """
+        if self.mode == "off":
+            if _cache_only.get():
+                raise LLMCacheMiss()
+            return fetch()
+        key, cached = self._lookup(provider, model, messages, params, refresh, cacheable)
+        if cached is not None:
+            return cached
+        if _cache_only.get():
+            raise LLMCacheMiss()
+        response = fetch()
+        if self._storable(response, cacheable):
+            self.put(key, provider, model, response)
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone() if self.mode != "off" else (0, 0)
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+
+llm_cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_MODE, LLM_CACHE_MAX_BYTES)
+
+
+def _run_cache_only(fn: Callable[..., T]) -> T:
+    token = _cache_only.set(True)
+    try:
+        return fn()
+    finally:
+        _cache_only.reset(token)
+
+
+async def run_cache_first(admission, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    fn 을 먼저 캐시 응답만으로 스레드풀에서 실행해 보고, LLM 호출이 필요할 때만
+    admission 자리를 (이벤트 루프에서) 잡은 뒤 다시 실행한다.
+    캐시 적중은 동시 실행 슬롯을 쓰지 않고, 대기열에 선 요청은 스레드를 점유하지 않는다.
+    fn 은 LLM 호출 전까지 부작용이 없어야 한다 (미적중이면 처음부터 다시 실행됨).
+    """
+    job = partial(fn, *args, **kwargs)
+    if llm_cache.mode in ("on", "replay"):
+        try:
+            return await run_in_threadpool(_run_cache_only, job)
+        except LLMCacheMiss:
+            pass
+    return await admission.run_in_threadpool(job)
@@ -1,23 +1,91 @@
+import os
 import logging
+from typing import Callable, Optional
+
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
+from services.admission import chat_gpt_admission, lg_ai_admission
+from services.client_registry import get_openai_client
+from services.llm_cache import llm_cache
+
 logger = logging.getLogger(__name__)
 
 MODEL_NAME = "LGAI-EXAONE/EXAONE-3.5-2.4B-Instruct"
+CHAT_GPT_MODEL = "gpt-4o-mini"
+CHAT_GPT_TEMPERATURE = 0.7
+
+# 추론 프로필 (GPU 없는 노드에서는 cpu-int8 계열 권장)
+#   baseline         : bfloat16, eager (기존 동작, GPU 가 있으면 GPU 사용)
+#   cpu-fp32         : float32, CPU 고정
+#   cpu-int8         : float32 + Linear 레이어 동적 int8 양자화
+#   cpu-int8-compile : cpu-int8 + torch.compile
+LLM_PROFILES = {
+    "baseline": {"dtype": torch.bfloat16, "cpu_only": False, "quantize": False, "compile": False},
+    "cpu-fp32": {"dtype": torch.float32, "cpu_only": True, "quantize": False, "compile": False},
+    "cpu-int8": {"dtype": torch.float32, "cpu_only": True, "quantize": True, "compile": False},
+    "cpu-int8-compile": {"dtype": torch.float32, "cpu_only": True, "quantize": True, "compile": True},
+}
+LLM_PROFILE = os.getenv("LLM_PROFILE", "baseline")
+
+# 워커별 스레드 수 (0 이면 torch 기본값). 여러 워커를 한 노드에 띄울 때 코어 수 / 워커 수로 맞춘다.
+LLM_TORCH_THREADS = int(os.getenv("LLM_TORCH_THREADS", "0"))
+LLM_TORCH_INTEROP_THREADS = int(os.getenv("LLM_TORCH_INTEROP_THREADS", "0"))
+
+
+def configure_torch_threads(threads: int = LLM_TORCH_THREADS, interop_threads: int = LLM_TORCH_INTEROP_THREADS):
+    """intra-op / inter-op 스레드 수 설정 (inter-op 은 병렬 작업 전에 한 번만 설정 가능)"""
+    if threads > 0:
+        torch.set_num_threads(threads)
+    if interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            logger.warning("✖ inter-op 스레드 수는 이미 설정되어 변경할 수 없음")
+    logger.info("  • torch 스레드: intra-op=%d, inter-op=%d", torch.get_num_threads(), torch.get_num_interop_threads())
+
+
+def load_model(profile_name: str):
+    """프로필에 맞게 모델을 로드하고, 모델과 장치를 반환"""
+    if profile_name not in LLM_PROFILES:
+        raise ValueError(f"알 수 없는 LLM 프로필: {profile_name} (가능: {', '.join(LLM_PROFILES)})")
+    profile = LLM_PROFILES[profile_name]
+
+    logger.info("▶ LLM 모델 로드 시작: %s (프로필: %s)", MODEL_NAME, profile_name)
+    model_ = AutoModelForCausalLM.from_pretrained(
+        MODEL_NAME,
+        torch_dtype=profile["dtype"],
+        trust_remote_code=True
+    )
+    model_.eval()
+
+    # 디바이스 결정 (요청마다 옮기지 않도록 로드 시 한 번만)
+    use_cuda = torch.cuda.is_available() and not profile["cpu_only"]
+    device_ = torch.device("cuda" if use_cuda else "cpu")
+    model_.to(device_)
+
+    if profile["quantize"]:
+        # Linear 가중치를 int8 로, 활성값은 실행 시점에 동적으로 양자화
+        logger.info("  • Linear 레이어 동적 int8 양자화")
+        model_ = torch.ao.quantization.quantize_dynamic(model_, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if profile["compile"]:
+        # generate() 는 그대로 두고 forward 만 컴파일 (시퀀스 길이가 변하므로 dynamic)
+        logger.info("  • torch.compile 적용")
+        model_.forward = torch.compile(model_.forward, dynamic=True)
+
+    return model_, device_
+
 
 # 모델·토크나이저 로드
-logger.info(f"▶ LLM 모델 로드 시작: {MODEL_NAME}")
-model = AutoModelForCausalLM.from_pretrained(
-    MODEL_NAME,
-    torch_dtype=torch.bfloat16,
-    trust_remote_code=True
-)
+configure_torch_threads()
+model, device = load_model(LLM_PROFILE)
 
 tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
 logger.info("▶ LLM 모델 및 토크나이저 로드 완료")
 
-def call_llm_lg_ai(system_prompt: str, user_prompt: str, max_new_tokens: int, do_sample: bool) -> str:
+def build_lg_ai_inputs(system_prompt: str, user_prompt: str) -> dict:
+    """채팅 템플릿을 적용해 model.generate 에 넘길 입력을 만든다"""
     # 메시지 구성
     messages = [
         {"role": "system", "content": system_prompt},
@@ -38,11 +106,7 @@ def call_llm_lg_ai(system_prompt: str, user_prompt: str, max_new_tokens: int, do
     else:
         ids = raw_inputs
     batch_size, seq_len = ids.shape
-    logger.debug(f"  • 배치 크기={batch_size}, 시퀀스 길이={seq_len}")
-
-    # 디바이스 결정
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model.to(device)
+    logger.debug("  • 배치 크기=%d, 시퀀스 길이=%d", batch_size, seq_len)
 
     if isinstance(raw_inputs, dict):
         # dict 형태라면 키별로 .to(device)
@@ -50,39 +114,66 @@ def call_llm_lg_ai(system_prompt: str, user_prompt: str, max_new_tokens: int, do
     else:
         # Tensor 하나라면 input_ids 키를 만들어서 dict 형태로 변환
         inputs = {"input_ids": raw_inputs.to(device)}
-    logger.debug(f"사용 장치: {device}")
-
-    # 생성
-    output = model.generate(
-        **inputs,
-        eos_token_id=tokenizer.eos_token_id,
-        max_new_tokens=max_new_tokens,
-        do_sample=do_sample
-    )
-    result = tokenizer.decode(output[0], skip_special_tokens=True)
+    logger.debug("사용 장치: %s", device)
+    return inputs
+
+def generate_lg_ai(inputs: dict, max_new_tokens: int, do_sample: bool, streamer=None):
+    with torch.inference_mode():
+        return model.generate(
+            **inputs,
+            eos_token_id=tokenizer.eos_token_id,
+            max_new_tokens=max_new_tokens,
+            do_sample=do_sample,
+            streamer=streamer
+        )
+
+def call_llm_lg_ai(system_prompt: str, user_prompt: str, max_new_tokens: int, do_sample: bool,
+                   refresh_cache: bool = False) -> str:
+    def generate() -> str:
+        inputs = build_lg_ai_inputs(system_prompt, user_prompt)
+
+        # 생성 (동시 실행 수 제한)
+        with lg_ai_admission.slot():
+            output = generate_lg_ai(inputs, max_new_tokens, do_sample)
+        return tokenizer.decode(output[0], skip_special_tokens=True)
+
+    # 같은 프롬프트·파라미터면 캐시된 응답 사용 (양자화 등으로 출력이 달라지므로 프로필도 키에 포함)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user",   "content": user_prompt}
+    ]
+    params = {"max_new_tokens": max_new_tokens, "do_sample": do_sample, "profile": LLM_PROFILE}
+    result = llm_cache.cached("lg-ai", MODEL_NAME, messages, params, generate, refresh=refresh_cache)
     # logger.info(f"생성된 응답: {result}")
     return result
 
-def call_llm_chat_gpt(system_prompt: str, user_prompt: str, max_new_tokens: int) -> str:
-    from openai import OpenAI
+def _chat_gpt_messages(system_prompt: str, user_prompt: str) -> list:
     from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
 
-    my_key = "<KEY>"
-
-    client = OpenAI(api_key=my_key)
-    messages = [
+    return [
         ChatCompletionSystemMessageParam(content=system_prompt, role="system"),
         ChatCompletionUserMessageParam(content=user_prompt, role="user"),
     ]
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        temperature=0.7,
-        max_tokens=max_new_tokens,
-    )
-    print(response.choices[0].message.content)
+def call_llm_chat_gpt(system_prompt: str, user_prompt: str, max_new_tokens: int, refresh_cache: bool = False,
+                      cacheable: Optional[Callable[[str], bool]] = None) -> str:
+    # 커넥션 풀을 재사용하는 공용 클라이언트
+    client = get_openai_client()
+    messages = _chat_gpt_messages(system_prompt, user_prompt)
+    params = {"temperature": CHAT_GPT_TEMPERATURE, "max_tokens": max_new_tokens}
+
+    def create() -> str:
+        with chat_gpt_admission.slot():
+            response = client.chat.completions.create(
+                model=CHAT_GPT_MODEL,
+                messages=messages,
+                **params,
+            )
+        return response.choices[0].message.content
 
-    content = response.choices[0].message.content
+    # 캐시 적중 시 LLM 호출(과 동시 실행 슬롯)을 건너뜀
+    # cacheable: 호출한 쪽에서 쓸 수 있는 응답인지 검사 (통과한 응답만 캐시에 저장)
+    content = llm_cache.cached("openai", CHAT_GPT_MODEL, messages, params, create, refresh=refresh_cache,
+                               cacheable=cacheable)
     # logger.info(f"생성된 응답: {content}")
     return content
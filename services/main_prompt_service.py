@@ -1,5 +1,6 @@
 import logging
-from typing import List, Optional
+import re
+from typing import Callable, List, Optional
 from json import JSONDecodeError
 import json
 
@@ -129,30 +130,67 @@ summary_system_prompt = (
 )
 
 
+def _parse_combined(response: str) -> ResponseWrapper:
+    raw_json = json.loads(response)
+    service_items = [
+        ServiceResponse(type="service", text=ServiceTextResponse(**item))
+        for item in raw_json["service"]
+    ]
+    summary_obj = SummaryResponse(
+        type="summary",
+        text=SummaryTextResponse(**raw_json["summary"])
+    )
+    return ResponseWrapper(service=service_items, summary=summary_obj)
+
+
+def _strip_service_json(response: str) -> str:
+    raw = response.lstrip('\ufeff').strip()
+    if raw.startswith("```"):
+        raw = re.sub(r"^```[a-zA-Z]*\n?", "", raw, count=1)
+        raw = re.sub(r"\n?```$", "", raw, count=1).strip()
+
+    # 최상위가 {…}, {…} 형태면 배열로 감싸기
+    if raw and raw[0] != "[":
+        raw = f"[{raw}]"
+    return raw
+
+
+def _parse_services(response: str) -> List[ServiceTextResponse]:
+    return [ServiceTextResponse(**item) for item in json.loads(_strip_service_json(response))]
+
+
+def _parse_summary(response: str) -> SummaryTextResponse:
+    return SummaryTextResponse(**json.loads(response))
+
+
+def _parses(parse: Callable[[str], object]) -> Callable[[str], bool]:
+    """parse 가 성공하는 응답만 LLM 캐시에 저장하도록 하는 검사 함수 ('no' 거절도 저장하지 않음)"""
+    def check(response: str) -> bool:
+        try:
+            parse(response)
+            return True
+        except Exception:
+            return False
+    return check
+
+
 def generate_combined_response(question: str, k_docs: list) -> Optional[ResponseWrapper]:
     user_prompt = f"사용자 질문: {question}\n 문서: {json.dumps(k_docs, ensure_ascii=False)}\n"
     max_retries = 3
     for attempt in range(1, max_retries + 1):
-        response = call_llm_chat_gpt(combined_system_prompt, user_prompt, max_tokens)
+        # 재시도 때는 캐시된 (파싱 실패한) 응답 대신 새로 생성
+        response = call_llm_chat_gpt(combined_system_prompt, user_prompt, max_tokens, refresh_cache=attempt > 1,
+                                     cacheable=_parses(_parse_combined))
 
         if response == "no" or response == "\"no\"" or response == "'no'":
             logger.info("LLM 응답: 'no' - 한국사 관련 질문이 아님")
             return None
 
         try:
-            raw_json = json.loads(response)
-            service_items = [
-                ServiceResponse(type="service", text=ServiceTextResponse(**item))
-                for item in raw_json["service"]
-            ]
-            summary_obj = SummaryResponse(
-                type="summary",
-                text=SummaryTextResponse(**raw_json["summary"])
-            )
-            return ResponseWrapper(service=service_items, summary=summary_obj)
+            return _parse_combined(response)
 
         except JSONDecodeError:
-            logger.error("LLM 응답 JSON 파싱 실패 (시도 %d/%d): %s", attempt, max_retries, raw)
+            logger.error("LLM 응답 JSON 파싱 실패 (시도 %d/%d): %s", attempt, max_retries, response)
             if attempt == max_retries:
                 raise InternalServerException("LLM 응답이 Json 으로 변환되지 않습니다.")
 
@@ -162,24 +200,17 @@ def generate_combined_response(question: str, k_docs: list) -> Optional[Response
 def generate_service_responses(question: str, k_docs: list) -> List[ServiceResponse]:
     from json import JSONDecodeError
     import json
-    import re
     user_prompt = f"사용자 질문: {question}\n 문서: {json.dumps(k_docs, ensure_ascii=False)}\n"
 
     max_retries = 3
     for attempt in range(1, max_retries + 1):
-        response = call_llm_chat_gpt(service_system_prompt, user_prompt, max_tokens)
+        response = call_llm_chat_gpt(service_system_prompt, user_prompt, max_tokens, refresh_cache=attempt > 1,
+                                     cacheable=_parses(_parse_services))
         if response == "no":
             logger.info("LLM 응답: 'no' - 한국사 관련 질문이 아님")
             return []
 
-        raw = response.lstrip('\ufeff').strip()
-        if raw.startswith("```"):
-            raw = re.sub(r"^```[a-zA-Z]*\n?", "", raw, count=1)
-            raw = re.sub(r"\n?```$", "", raw, count=1).strip()
-
-        # 최상위가 {…}, {…} 형태면 배열로 감싸기
-        if raw and raw[0] != "[":
-            raw = f"[{raw}]"
+        raw = _strip_service_json(response)
 
         try:
             data = json.loads(raw)
@@ -206,7 +237,8 @@ def generate_summary_response(services: List[ServiceTextResponse]) -> SummaryRes
 
     max_retries = 3
     for attempt in range(1, max_retries + 1):
-        response = call_llm_chat_gpt(summary_system_prompt, user_prompt, max_tokens)
+        response = call_llm_chat_gpt(summary_system_prompt, user_prompt, max_tokens, refresh_cache=attempt > 1,
+                                     cacheable=_parses(_parse_summary))
 
         try:
             result = json.loads(response)
@@ -231,7 +263,8 @@ def generate_summary_response_test(services: List[ServiceResponse]) -> SummaryRe
 
     max_retries = 3
     for attempt in range(1, max_retries + 1):
-        response = call_llm_chat_gpt(summary_system_prompt, user_prompt, max_tokens)
+        response = call_llm_chat_gpt(summary_system_prompt, user_prompt, max_tokens, refresh_cache=attempt > 1,
+                                     cacheable=_parses(_parse_summary))
 
         try:
             result = json.loads(response)
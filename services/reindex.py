@@ -0,0 +1,151 @@
+import os
+import glob
+import json
+import time
+import logging
+import threading
+
+from chromadb.errors import NotFoundError
+
+from exception_handler import BadRequestException
+from services.chunking import CHUNKERS, load_chunks
+from services.chroma_utils import COLLECTION_NAME, DATA_GLOB, embed_model, build_collection, read_alias, \
+    update_alias, write_alias, active_collection_name, hnsw_metadata
+from services.client_registry import get_chroma_client, invalidate_collection
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 하나의 재색인(또는 롤백)만 실행. 워커 프로세스가 여러 개여도 보이도록 잠금과 상태는
+# 별칭 컬렉션 metadata 에 둔다. 잠근 프로세스가 죽어도 REINDEX_LOCK_TTL 초가 지나면 다시 잡을 수 있다.
+REINDEX_LOCK_TTL = float(os.getenv("REINDEX_LOCK_TTL", str(2 * 60 * 60)))
+
+
+def _try_lock(holder: str) -> bool:
+    alias = read_alias()
+    current = alias.get("reindexing")
+    if current and time.time() - alias.get("reindexing_since", 0.0) < REINDEX_LOCK_TTL:
+        return False
+    if current:
+        logger.warning("✖ 오래된 재색인 잠금 해제: %s", current)
+        # 죽은 재색인이 만들다 만 컬렉션 정리 (읽기 대상·롤백용 버전은 건드리지 않음)
+        if current not in (alias.get("active"), alias.get("previous")):
+            _drop(current)
+    update_alias(reindexing=holder, reindexing_since=time.time())
+    # Chroma 에는 compare-and-set 이 없으므로 다시 읽어 확인한다. 동시에 쓴 쪽 중 마지막 것만 진행
+    return read_alias().get("reindexing") == holder
+
+
+def _unlock(holder: str, **fields):
+    """잠금을 놓으면서 fields 도 함께 기록 (그 사이 다른 쪽이 잠금을 가져갔으면 잠금은 건드리지 않음)"""
+    if read_alias().get("reindexing") == holder:
+        fields.update(reindexing=None, reindexing_since=None)
+    if fields:
+        update_alias(**fields)
+
+
+def read_reindex_status() -> dict:
+    """마지막(또는 진행 중인) 재색인 상태"""
+    alias = read_alias()
+    status = json.loads(alias.get("reindex_status", '{"state": "idle"}'))
+    status["locked_by"] = alias.get("reindexing")
+    return status
+
+
+def _save_status(status: dict, **fields):
+    update_alias(reindex_status=json.dumps(status, ensure_ascii=False), **fields)
+
+
+def start_reindex(strategy: str, params: dict, batch_size: int, workers: int, hnsw: dict = None,
+                  dedup_threshold: float = None) -> dict:
+    """
+    새 버전 컬렉션을 백그라운드 스레드에서 만들고, 검증이 끝나면 읽기 대상을 전환한다.
+    기존 컬렉션은 전환 전까지 그대로 검색에 쓰이고, 전환 후에는 롤백용으로 남긴다.
+    """
+    if strategy not in CHUNKERS:
+        raise BadRequestException(f"알 수 없는 청킹 전략이야: {strategy}")
+    hnsw = hnsw or hnsw_metadata()
+
+    version = f"{COLLECTION_NAME}-v{time.strftime('%Y%m%d%H%M%S')}{int(time.time() * 1000) % 1000:03d}"
+    if not _try_lock(version):
+        raise BadRequestException("이미 재색인이 진행 중이야.")
+
+    status = {"state": "running", "version": version, "strategy": strategy, "hnsw": hnsw,
+              "dedup_threshold": dedup_threshold, "started_at": time.time()}
+    try:
+        _save_status(status)
+    except Exception:
+        _unlock(version)
+        raise
+    threading.Thread(target=_run, args=(version, strategy, params, batch_size, workers, hnsw, dedup_threshold,
+                                        status), daemon=True).start()
+    return dict(status)
+
+
+def _run(version: str, strategy: str, params: dict, batch_size: int, workers: int, hnsw: dict,
+         dedup_threshold: float, status: dict):
+    logger.info("▶ 재색인 시작: %s (청킹: %s)", version, strategy)
+    switched = False
+    try:
+        if strategy == "token":
+            params = dict(params, tokenizer=embed_model.tokenizer)
+        docs, metadatas = load_chunks(glob.glob(DATA_GLOB), strategy, **params)
+        if not docs:
+            raise RuntimeError("청크가 하나도 만들어지지 않음")
+
+        _, dedup = build_collection(version, docs, metadatas, batch_size, workers, hnsw, dedup_threshold)
+        expected = dedup["after"] if dedup else len(docs)
+        if dedup:
+            status["dedup"] = dedup
+
+        # 저장된 문서 수 검증
+        count = get_chroma_client().get_collection(name=version).count()
+        if count != expected:
+            raise RuntimeError(f"문서 수 불일치: 기대 {expected}개, 저장 {count}개")
+
+        # 전환: 현재 버전은 롤백용 previous 로, 그 이전 버전은 삭제
+        stale = read_alias().get("previous")
+        current = active_collection_name(force=True)
+        write_alias(active=version, previous=current)
+        switched = True
+        if stale and stale not in (version, current):
+            _drop(stale)
+
+        status.update({"state": "done", "documents": count, "previous": current, "finished_at": time.time()})
+        logger.info("✔ 재색인 완료: %s (%d개 문서)", version, count)
+    except Exception as e:
+        logger.exception("✖ 재색인 실패: %s", version)
+        # 만들다 실패한 컬렉션도 지운다 (build_collection 안에서 생성 직후 실패해도 남지 않도록)
+        if not switched:
+            _drop(version)
+        status.update({"state": "failed", "error": str(e), "finished_at": time.time()})
+    finally:
+        try:
+            _unlock(version, reindex_status=json.dumps(status, ensure_ascii=False))
+        except Exception:
+            # 여기서 실패하면 잠금은 REINDEX_LOCK_TTL 뒤에 풀린다
+            logger.exception("✖ 재색인 상태 기록 실패: %s", version)
+
+
+def _drop(name: str):
+    try:
+        get_chroma_client().delete_collection(name=name)
+        logger.info("  • 컬렉션 삭제: %s", name)
+    except NotFoundError:
+        pass
+    invalidate_collection(name)
+
+
+def rollback() -> dict:
+    """직전 버전으로 읽기 대상을 되돌림 (되돌린 버전은 다시 previous 로 남김)"""
+    holder = f"rollback-{time.time():.3f}"
+    if not _try_lock(holder):
+        raise BadRequestException("재색인이 진행 중이라 롤백할 수 없어.")
+    try:
+        alias = read_alias()
+        previous = alias.get("previous")
+        if not previous:
+            raise BadRequestException("되돌릴 이전 버전이 없어.")
+        write_alias(active=previous, previous=alias.get("active"))
+        return {"active": previous, "previous": alias.get("active")}
+    finally:
+        _unlock(holder)
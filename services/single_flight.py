@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import Awaitable, Callable, Dict, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def normalize_question(question: str) -> str:
+    """공백·대소문자·끝 문장부호 차이를 없앤 질문 (같은 질문 판별용)"""
+    text = unicodedata.normalize("NFC", question)
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    return text.rstrip("?!.~ ")
+
+
+def lesson_key(question: str, doc_ids: List[str]) -> str:
+    """정규화된 질문 + 검색된 문서 ID 로 만든 키"""
+    raw = normalize_question(question) + "\x00" + ",".join(doc_ids)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 작업을 하나로 합친다.
+    처음 들어온 요청이 작업을 시작하고, 나머지는 같은 작업의 결과(또는 예외)를 함께 받는다.
+    기다리던 요청이 모두 취소되면 작업도 취소한다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._inflight.get(key)
+        if call is None:
+            self.leaders += 1
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda t: self._finish(key, call))
+        else:
+            self.coalesced += 1
+            logger.info("✔ [%s] 진행 중인 작업에 합류 (대기 %d명)", self.name, call.waiters + 1)
+
+        call.waiters += 1
+        try:
+            # shield: 한 요청이 취소돼도 공유 작업은 계속 진행
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                logger.info("✖ [%s] 기다리는 요청이 없어 작업 취소", self.name)
+                # 취소 중인 작업에 새 요청이 합류하지 않도록 바로 뺀다
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+
+    def _forget(self, key: str, call: _Call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+    def _finish(self, key: str, call: _Call):
+        self._forget(key, call)
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.failures += 1
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+        }
+
+
+# /question 첫 턴의 수업 생성 파이프라인 공용 인스턴스
+lesson_flight = SingleFlight("lesson")
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from exception_handler import TooManyRequestsException, ServiceUnavailableException
+from services.admission import AdmissionController
+
+
+def _controller(max_concurrency: int = 1, max_queue: int = 4, max_wait: float = 5.0) -> AdmissionController:
+    return AdmissionController("test", max_concurrency=max_concurrency, max_queue=max_queue, max_wait=max_wait)
+
+
+def test_rejects_with_429_when_queue_is_full():
+    async def scenario():
+        admission = _controller(max_queue=1)
+        await admission.acquire_async()
+        queued = asyncio.create_task(admission.acquire_async())
+        await asyncio.sleep(0)
+        assert admission.stats()["queue_depth"] == 1
+
+        with pytest.raises(TooManyRequestsException) as exc:
+            await admission.acquire_async()
+        assert exc.value.retry_after >= 1
+        assert admission.stats()["rejected"] == 1
+
+        admission.release(0.1)
+        await queued
+        admission.release(0.1)
+
+    asyncio.run(scenario())
+
+
+def test_times_out_with_503():
+    async def scenario():
+        admission = _controller(max_wait=0.05)
+        await admission.acquire_async()
+        with pytest.raises(ServiceUnavailableException):
+            await admission.acquire_async()
+        stats = admission.stats()
+        assert stats["timeouts"] == 1
+        assert stats["queue_depth"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_thread_waiter_times_out_with_503():
+    admission = _controller(max_wait=0.05)
+    admission.acquire()
+    with pytest.raises(ServiceUnavailableException):
+        admission.acquire()
+    assert admission.stats()["queue_depth"] == 0
+
+
+def test_grants_slots_in_priority_order():
+    async def scenario():
+        admission = _controller()
+        await admission.acquire_async()
+        order = []
+
+        async def wait(priority: int):
+            await admission.acquire_async(priority)
+            order.append(priority)
+            admission.release(0.1)
+
+        # 낮은 우선순위부터 줄을 세워도 높은 우선순위(작은 값)가 먼저 들어간다
+        tasks = [asyncio.create_task(wait(priority)) for priority in (2, 1, 0)]
+        await asyncio.sleep(0)
+        admission.release(0.1)
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        admission = _controller()
+        await admission.acquire_async()
+        waiter = asyncio.create_task(admission.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert admission.stats()["queue_depth"] == 0
+
+        admission.release(0.1)
+        assert admission.stats()["in_use"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_nested_slot_reuses_the_held_slot():
+    async def scenario():
+        admission = _controller(max_wait=0.5)
+
+        def job():
+            # 이벤트 루프에서 잡은 자리를 스레드 안의 slot() 이 그대로 쓴다 (자리가 하나뿐이어도 막히지 않음)
+            with admission.slot():
+                with admission.slot():
+                    return admission.stats()["in_use"]
+
+        assert await admission.run_in_threadpool(job) == 1
+        stats = admission.stats()
+        assert stats["in_use"] == 0
+        assert stats["admitted"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+import numpy as np
+
+from services.dedup import near_duplicate_clusters, collapse_near_duplicates
+
+
+def _corpus(n: int = 300, dim: int = 64, seed: int = 1):
+    """
+    E5 처럼 모든 문서가 한 방향으로 치우친 임베딩에 거의 같은 문서 쌍을 심는다.
+    반환: (임베딩, 심은 쌍 목록)
+    """
+    rng = np.random.default_rng(seed)
+    shared = rng.standard_normal(dim) * 3
+    embs = rng.standard_normal((n, dim)) + shared
+    pairs = [(i, n - 1 - i) for i in range(0, 50, 5)]
+    for a, b in pairs:
+        embs[b] = embs[a] + rng.standard_normal(dim) * 0.15
+    return embs, pairs
+
+
+def _cosine(a, b) -> float:
+    return float(a @ b / np.linalg.norm(a) / np.linalg.norm(b))
+
+
+def test_finds_planted_pairs():
+    embs, pairs = _corpus()
+    clusters = near_duplicate_clusters(embs, threshold=0.98)
+    merged = [members for members in clusters if len(members) > 1]
+    assert sorted(tuple(members) for members in merged) == sorted(pairs)
+
+
+def test_does_not_merge_below_threshold():
+    embs, pairs = _corpus()
+    a, b = pairs[0]
+    threshold = _cosine(embs[a], embs[b]) + 1e-4
+    clusters = near_duplicate_clusters(embs, threshold=threshold)
+    assert [a] in clusters and [b] in clusters
+
+
+def test_collapse_keeps_longest_document_and_records_sources():
+    embs, pairs = _corpus()
+    docs = [f"문서 {i}" for i in range(len(embs))]
+    metadatas = [{"source": "first.txt" if i < 150 else "second.txt", "era": "삼국"} for i in range(len(embs))]
+    a, b = pairs[0]
+    docs[b] = docs[b] + " (더 긴 서술)"
+
+    kept_docs, kept_metas, kept_embs, report = collapse_near_duplicates(docs, metadatas, embs, threshold=0.98)
+    assert report["before"] == len(docs)
+    assert report["after"] == len(docs) - len(pairs)
+    assert report["merged_clusters"] == len(pairs)
+    assert len(kept_docs) == len(kept_metas) == len(kept_embs)
+
+    meta = kept_metas[kept_docs.index(docs[b])]
+    assert docs[a] not in kept_docs
+    assert meta["sources"] == "first.txt,second.txt"
+    assert meta["duplicates"] == 1
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from services.chunking import load_chunks
+from services.era_router import tag_eras, era_filter
+
+SIXTH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sixth_.txt")
+
+
+@pytest.fixture(scope="module")
+def sixth_eras():
+    """data/sixth_.txt 의 줄 번호 → 태깅된 시대"""
+    docs, metadatas = load_chunks([SIXTH], "line")
+    with open(SIXTH, encoding="utf-8") as f:
+        line_numbers = [number for number, line in enumerate(f, 1) if line.strip()]
+    assert len(line_numbers) == len(docs)
+    return {number: meta["era"] for number, meta in zip(line_numbers, metadatas)}
+
+
+@pytest.mark.parametrize("line", [
+    523,  # 동학 농민 운동 (1894년)
+    531,  # '삼국 간섭' 은 삼국 시대가 아니다
+    533,  # 갑오개혁과 을미개혁
+    537,  # 독립 신문 창간
+    541,  # 광무 연호, 대한 제국
+])
+def test_late_joseon_lines_are_modern(sixth_eras, line):
+    assert sixth_eras[line] == "근현대"
+
+
+def test_following_section_returns_to_three_kingdoms(sixth_eras):
+    # 한자·유학 도입 단원은 다시 삼국 시대부터 서술한다
+    assert sixth_eras[545] == "삼국"
+    assert sixth_eras[547] == "삼국"
+
+
+def test_repeated_country_name_does_not_outweigh_modern_keywords():
+    # 근대 서술에 나라 이름 '조선' 이 여러 번 나와도 키워드 하나는 3번까지만 센다
+    chunk = "조선 정부는 조선의 개항 이후 조선 사회와 조선 경제를 바꾸려 했고, 개화 정책과 갑신정변이 이어졌다."
+    assert tag_eras([chunk]) == ["근현대"]
+
+
+def test_bc_years_are_not_modern():
+    assert tag_eras(["고조선은 기원전 2333년에 세워졌다.", "기원전 1900년 무렵 청동기 문화가 퍼졌다."]) == ["선사", "선사"]
+
+
+def test_chunks_without_keywords_inherit_previous_era():
+    assert tag_eras(["고려는 거란의 침입을 물리쳤다.", "이후 여러 제도를 정비하였다."]) == ["고려", "고려"]
+
+
+def test_era_filter():
+    assert era_filter(None) is None
+    assert era_filter(["고려"]) == {"era": "고려"}
+    assert era_filter(["고려", "조선"]) == {"era": {"$in": ["고려", "조선"]}}
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+import services.llm_cache as llm_cache_module
+from exception_handler import InternalServerException
+from services.admission import AdmissionController
+from services.llm_cache import LLMCache
+
+
+class _Fetch:
+    """호출 횟수를 세는 가짜 LLM 호출"""
+
+    def __init__(self, response: str = "answer"):
+        self.response = response
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        return self.response
+
+
+def _cached(cache: LLMCache, fetch, prompt: str = "question", **kwargs) -> str:
+    return cache.cached("openai", "gpt", [{"role": "user", "content": prompt}], {"temperature": 0}, fetch, **kwargs)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite3")
+
+
+def test_on_mode_reuses_stored_response(path):
+    cache = LLMCache(path, "on")
+    fetch = _Fetch()
+    assert _cached(cache, fetch) == "answer"
+    assert _cached(cache, fetch) == "answer"
+    assert fetch.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_refresh_skips_and_overwrites_entry(path):
+    cache = LLMCache(path, "on")
+    _cached(cache, _Fetch("old"))
+    assert _cached(cache, _Fetch("new"), refresh=True) == "new"
+    assert _cached(cache, _Fetch("unused")) == "new"
+
+
+def test_off_mode_never_stores(path):
+    cache = LLMCache(path, "off")
+    fetch = _Fetch()
+    _cached(cache, fetch)
+    _cached(cache, fetch)
+    assert fetch.calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_record_then_replay(path):
+    recorder = LLMCache(path, "record")
+    fetch = _Fetch("recorded")
+    _cached(recorder, fetch)
+    _cached(recorder, fetch)
+    assert fetch.calls == 2  # record 는 항상 실제로 호출
+
+    replayer = LLMCache(path, "replay")
+    offline = _Fetch("network")
+    assert _cached(replayer, offline) == "recorded"
+    assert offline.calls == 0
+    with pytest.raises(InternalServerException):
+        _cached(replayer, offline, prompt="never recorded")
+    assert offline.calls == 0
+
+
+def test_rejected_response_is_not_stored(path):
+    cache = LLMCache(path, "on")
+    usable = lambda response: response != "no"
+    assert _cached(cache, _Fetch("no"), cacheable=usable) == "no"
+    assert cache.stats()["entries"] == 0
+
+    fetch = _Fetch("good")
+    assert _cached(cache, fetch, cacheable=usable) == "good"
+    assert _cached(cache, fetch, cacheable=usable) == "good"
+    assert fetch.calls == 1
+
+
+def test_rejected_entry_counts_as_miss(path):
+    # record 모드로 녹화된 'no' 응답은 on 모드의 검증을 통과하지 못하므로 쓰지 않고 미적중으로 센다
+    _cached(LLMCache(path, "record"), _Fetch("no"))
+    cache = LLMCache(path, "on")
+    fetch = _Fetch("good")
+    assert _cached(cache, fetch, cacheable=lambda response: response != "no") == "good"
+    assert fetch.calls == 1
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_evicts_least_recently_used_entries(path):
+    cache = LLMCache(path, "on", max_bytes=1000)
+    for i in range(4):
+        _cached(cache, _Fetch("x" * 300), prompt=f"q{i}")
+    _cached(cache, _Fetch(), prompt="q1")  # q1 을 최근에 쓴 항목으로
+
+    _cached(cache, _Fetch("x" * 300), prompt="q4")
+    stats = cache.stats()
+    assert stats["bytes"] <= 900
+    assert stats["evictions"] >= 1
+    # 가장 오래 안 쓴 q0 은 지워지고, 방금 쓴 q1 은 남는다
+    assert _cached(cache, _Fetch("refetched"), prompt="q0") == "refetched"
+    assert _cached(cache, _Fetch("refetched"), prompt="q1") == "x" * 300
+
+
+def test_size_is_shared_between_processes(path):
+    # 워커 프로세스마다 LLMCache 인스턴스가 따로 있어도 같은 파일의 전체 크기를 기준으로 정리한다
+    first, second = LLMCache(path, "on", max_bytes=1000), LLMCache(path, "on", max_bytes=1000)
+    for i in range(6):
+        _cached(first if i % 2 else second, _Fetch("x" * 200), prompt=f"q{i}")
+    assert first.stats()["bytes"] == second.stats()["bytes"] <= 1000
+
+
+def test_cache_hit_does_not_take_an_admission_slot(path, monkeypatch):
+    cache = LLMCache(path, "on")
+    monkeypatch.setattr(llm_cache_module, "llm_cache", cache)
+    fetch = _Fetch()
+    job = lambda prompt: _cached(cache, fetch, prompt=prompt)
+
+    async def scenario():
+        admission = AdmissionController("test", max_concurrency=1, max_queue=4, max_wait=5)
+        assert await llm_cache_module.run_cache_first(admission, job, "cached") == "answer"
+
+        await admission.acquire_async()  # 유일한 자리를 점유
+        assert await asyncio.wait_for(llm_cache_module.run_cache_first(admission, job, "cached"), 1) == "answer"
+
+        miss = asyncio.create_task(llm_cache_module.run_cache_first(admission, job, "new"))
+        await asyncio.sleep(0.1)
+        assert not miss.done()
+        assert admission.stats()["queue_depth"] == 1
+        admission.release(0.1)
+        assert await miss == "answer"
+        return admission.stats()["admitted"]
+
+    assert asyncio.run(scenario()) == 3
+    assert fetch.calls == 2
+    assert (cache.hits, cache.misses) == (1, 2)
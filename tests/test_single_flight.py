@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight, lesson_key
+
+
+def test_concurrent_callers_share_one_result():
+    async def scenario():
+        flight = SingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "lesson"
+
+        results = await asyncio.gather(flight.do("key", work), flight.do("key", work))
+        assert results == ["lesson", "lesson"]
+        assert len(calls) == 1
+        assert flight.stats() == {"inflight": 0, "leaders": 1, "coalesced": 1, "failures": 0}
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_callers_share_one_error():
+    async def scenario():
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert results[0] is results[1]
+        assert flight.stats()["failures"] == 1
+        assert flight.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_one_caller_keeps_the_shared_work():
+    async def scenario():
+        flight = SingleFlight("test")
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "lesson"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        release.set()
+        assert await second == "lesson"
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_every_caller_cancels_the_work():
+    async def scenario():
+        flight = SingleFlight("test")
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flight.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_lesson_key_ignores_spacing_and_trailing_punctuation():
+    assert lesson_key("고인돌은  어느 시대야??", ["1", "2"]) == lesson_key("고인돌은 어느 시대야", ["1", "2"])
+    assert lesson_key("고인돌은 어느 시대야", ["1", "2"]) != lesson_key("고인돌은 어느 시대야", ["2", "1"])